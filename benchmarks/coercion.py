@@ -0,0 +1,40 @@
+"""
+Throughput of decoding raw values, trying every kind of property in order versus the single pass `coerce`.
+
+    python -m benchmarks.coercion
+"""
+
+import timeit
+
+from configatron.nodes.property import coerce, properties
+
+
+VALUES = {
+    "array": "1,2,3",
+    "boolean": "true",
+    "number": "-21.5",
+    "path": "/srv/ftp",
+    "string": '"ftp"',
+}
+DECODES = 200000
+
+
+def pipeline(value: str):
+    """Try every kind of property, in order."""
+
+    for kind in properties:
+        decoded = kind(value)
+        if decoded is not None:
+            return decoded
+
+
+def main():
+    for kind, value in VALUES.items():
+        before = DECODES / timeit.timeit(lambda: pipeline(value), number=DECODES)
+        after = DECODES / timeit.timeit(lambda: coerce(value), number=DECODES)
+
+        print(f"{kind:8}: pipeline {before / 1e6:6.2f}M values/s, coerce {after / 1e6:6.2f}M values/s")
+
+
+if __name__ == "__main__":
+    main()
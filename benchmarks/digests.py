@@ -0,0 +1,62 @@
+"""
+Cost of each digest: building the index, hashing the entire config (the source key) and checking groups' freshness.
+
+    python -m benchmarks.digests
+"""
+
+import os
+import tempfile
+import time
+
+from configatron import Configatron
+from configatron.digests import DIGESTS
+from configatron.scanner import Scanner
+
+from .generate import generate
+
+
+GROUPS = 100000
+PROPERTIES = 10
+
+
+def measure(path: str, digest: str):
+    """Seconds needed to build the index and to compute the source key, and the number of freshness checks per second."""
+
+    started = time.perf_counter()
+    config = Configatron(path, validate=False, digest=digest)
+    config.index.build()
+    build = time.perf_counter() - started
+
+    index = config.index
+
+    started = time.perf_counter()
+    index._compute_source_key(index.reader)
+    key = time.perf_counter() - started
+
+    scanner = Scanner(index.reader.snapshot(), digest=digest)
+    groups = list(index.groups_index.values())
+
+    started = time.perf_counter()
+    for group in groups:
+        group.is_fresh(scanner)
+    fresh = len(groups) / (time.perf_counter() - started)
+
+    return build, key, fresh
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.ini")
+        generate(path, GROUPS, PROPERTIES)
+
+        print(f"{GROUPS} groups, {os.path.getsize(path) // 1024} KiB")
+        for digest in DIGESTS:
+            build, key, fresh = measure(path, digest)
+            print(
+                f"{digest:9}: build {build:6.3f}s, source key {key * 1000:7.2f}ms, "
+                f"freshness {fresh / 1000:6.1f}k groups/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Rebuilds triggered by a steady read workload, on an unchanged config: every lookup misses the cache, so the group found
+in the index is checked for freshness. The config is either settled, so its modification time can be trusted, or
+recently modified, so its content has to be read.
+
+    python -m benchmarks.freshness
+"""
+
+import os
+import random
+import tempfile
+import time
+from unittest import mock
+
+from configatron import Configatron
+
+from .generate import generate
+
+
+GROUPS = 10000
+PROPERTIES = 10
+LOOKUPS = 10000
+
+# files modified more recently than this are hashed instead of trusting their modification time
+SETTLE = 2
+
+
+def measure(path: str):
+    """Number of builds and of actual updates of the index, and the time of a lookup."""
+
+    config = Configatron(path, cache_options={"size": 1})
+    names = [f"group{random.randrange(GROUPS)}" for _ in range(LOOKUPS)]
+
+    build, update = config.index.build, config.index._update
+    with mock.patch.object(config.index, "build", wraps=build) as builds:
+        with mock.patch.object(config.index, "_update", wraps=update) as updates:
+            started = time.perf_counter()
+            for name in names:
+                config.get(name)
+
+            elapsed = time.perf_counter() - started
+
+    return builds.call_count, updates.call_count, elapsed / LOOKUPS
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.ini")
+        generate(path, GROUPS, PROPERTIES)
+
+        for settled in [True, False]:
+            mtime = time.time_ns() - (SETTLE * 1_000_000_000 if settled else 0)
+            os.utime(path, ns=(mtime, mtime))
+
+            builds, updates, lookup = measure(path)
+            print(
+                f"{'settled' if settled else 'modified':8}: {LOOKUPS} lookups, {builds:5} builds, "
+                f"{updates:5} updates, {lookup * 1e6:8.1f} us per lookup"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Synthetic config files, for benchmarks. Configs can be generated from the command line as well, up to a given size.
+
+    python -m benchmarks.generate config.ini --groups 100000 --properties 10 --overrides 2 --comments 1
+    python -m benchmarks.generate config.ini --size 2G
+"""
+
+import argparse
+import random
+from typing import Iterator
+
+
+VALUES = ['"value"', "123", "-1.5", "yes", "/a/b/c", "a,b,c"]
+
+# Groups are written in batches, so writing multi-GB configs isn't slowed down by a write for every line.
+BATCH = 1000
+
+UNITS = {"K": 1024, "M": 1024 * 1024, "G": 1024 * 1024 * 1024}
+
+
+def synthetic_groups(properties: int, seed: int = 0, overrides: int = 0, comments: int = 0) -> Iterator[str]:
+    """
+    Yield the text of synthetic groups, endlessly.
+
+    :param properties: Number of properties per group.
+    :param seed: Random seed, so configs are reproducible.
+    :param overrides: Number of overridden values of each property, for overrides named override_a, override_b, ...
+    :param comments: Number of comment lines per group.
+    :return: yields groups
+    """
+
+    rand = random.Random(seed)
+    group = 0
+
+    while True:
+        lines = [f"[group{group}] ; comment\n"]
+        lines += [f"; comment {comment}\n" for comment in range(comments)]
+
+        for prop in range(properties):
+            name = f"property_{chr(97 + prop % 26)}"
+            lines.append(f"{name} = {rand.choice(VALUES)}\n")
+
+            for override in range(overrides):
+                lines.append(f"{name}<override_{chr(97 + override % 26)}> = {rand.choice(VALUES)}\n")
+
+        lines.append("\n")
+
+        yield "".join(lines)
+        group += 1
+
+
+def generate(path: str, groups: int, properties: int, seed: int = 0, overrides: int = 0, comments: int = 0):
+    """
+    Write a synthetic config file, with `groups` groups, each one having `properties` properties.
+
+    :param path: Where to write the config.
+    :param groups: Number of groups.
+    :param properties: Number of properties per group.
+    :param seed: Random seed, so configs are reproducible.
+    :param overrides: Number of overridden values of each property.
+    :param comments: Number of comment lines per group.
+    :return: None
+    """
+
+    generated = synthetic_groups(properties, seed, overrides, comments)
+
+    with open(path, "w") as config:
+        for start in range(0, groups, BATCH):
+            config.write("".join(next(generated) for _ in range(min(BATCH, groups - start))))
+
+
+def generate_size(path: str, size: int, properties: int, seed: int = 0, overrides: int = 0, comments: int = 0) -> int:
+    """
+    Write a synthetic config file of at least `size` bytes, with as many groups as needed.
+
+    :param path: Where to write the config.
+    :param size: Size of the config, in bytes.
+    :param properties: Number of properties per group.
+    :param seed: Random seed, so configs are reproducible.
+    :param overrides: Number of overridden values of each property.
+    :param comments: Number of comment lines per group.
+    :return: number of groups
+    """
+
+    generated = synthetic_groups(properties, seed, overrides, comments)
+    written, count, batch = 0, 0, []
+
+    with open(path, "w") as config:
+        while written < size:
+            group = next(generated)
+            batch.append(group)
+
+            written += len(group)
+            count += 1
+
+            if len(batch) == BATCH:
+                config.write("".join(batch))
+                batch = []
+
+        config.write("".join(batch))
+
+    return count
+
+
+def parse_size(size: str) -> int:
+    """Number of bytes, from sizes like 512, 64K, 100M or 2G."""
+
+    unit = size[-1:].upper()
+    if unit in UNITS:
+        return int(size[:-1]) * UNITS[unit]
+
+    return int(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic config file.")
+    parser.add_argument("path", help="where to write the config")
+    parser.add_argument("--groups", type=int, default=10000, help="number of groups, unless --size is given")
+    parser.add_argument("--size", type=parse_size, help="size of the config, e.g. 100M or 2G")
+    parser.add_argument("--properties", type=int, default=10, help="number of properties per group")
+    parser.add_argument("--overrides", type=int, default=0, help="number of overridden values of each property")
+    parser.add_argument("--comments", type=int, default=0, help="number of comment lines per group")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    arguments = parser.parse_args()
+
+    options = (arguments.properties, arguments.seed, arguments.overrides, arguments.comments)
+    if arguments.size is not None:
+        count = generate_size(arguments.path, arguments.size, *options)
+    else:
+        count = arguments.groups
+        generate(arguments.path, count, *options)
+
+    print(f"{count} groups written to {arguments.path}")
+
+
+if __name__ == "__main__":
+    main()
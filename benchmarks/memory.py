@@ -0,0 +1,78 @@
+"""
+Peak memory used by `Index.build()`, for configs of increasing size.
+
+The number of groups is kept constant, so the index itself has the same size. Only the amount of lines that needs to be
+streamed grows, and the peak memory should stay the same.
+
+Memory held by the index, per group, for configs with an increasing number of groups, for each index engine.
+
+    python -m benchmarks.memory
+"""
+
+import os
+import tempfile
+import tracemalloc
+
+from configatron.engines import ENGINES
+from configatron.index import Index
+
+from .generate import generate
+
+
+GROUPS = 10
+PROPERTIES = [1000, 10000, 100000]
+
+INDEX_GROUPS = [10000, 100000, 1000000]
+
+
+def measure(path: str) -> int:
+    """Peak memory, in bytes, allocated while building the index."""
+
+    index = Index(path)
+
+    tracemalloc.start()
+    index.build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak
+
+
+def measure_index(path: str, engine: str) -> int:
+    """Memory, in bytes, held by the index once it's built."""
+
+    tracemalloc.start()
+    index = Index(path, engine=engine)
+    index.build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return current
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for properties in PROPERTIES:
+            path = os.path.join(directory, f"config-{properties}.ini")
+            generate(path, GROUPS, properties)
+
+            size = os.path.getsize(path)
+            peak = measure(path)
+
+            print(f"{size / 1024 / 1024:10.2f} MB config: {peak / 1024:10.2f} KB peak memory")
+
+        for groups in INDEX_GROUPS:
+            path = os.path.join(directory, f"config-{groups}-groups.ini")
+            generate(path, groups, 1)
+
+            for engine in ENGINES:
+                index = measure_index(path, engine)
+
+                print(
+                    f"{groups:10} groups, {engine:>8}: {index / 1024 / 1024:10.2f} MB index, "
+                    f"{index / groups:7.0f} B per group"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Time of a property lookup, `Group.get(name)`, on an indexed group, with 0, 1 and 10 active overrides.
+
+Every property has a variant for each override, so lookups always resolve the override with the highest priority.
+
+    python -m benchmarks.overrides
+"""
+
+import os
+import tempfile
+import timeit
+
+from configatron import Configatron
+
+
+OVERRIDES = [0, 1, 10]
+PROPERTIES = 100
+LOOKUPS = 1000000
+
+
+def generate(path: str, overrides: int):
+    """Write a config with one group, where every property has a variant for each override."""
+
+    with open(path, "w") as config:
+        config.write("[group]\n")
+
+        for prop in range(PROPERTIES):
+            name = f"property_{chr(97 + prop % 26) * (prop // 26 + 1)}"
+
+            config.write(f"{name} = {prop}\n")
+            for override in range(overrides):
+                config.write(f"{name}<override_{chr(97 + override)}> = {prop}\n")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for overrides in OVERRIDES:
+            path = os.path.join(directory, f"config-{overrides}.ini")
+            generate(path, overrides)
+
+            config = Configatron(path, [f"override_{chr(97 + override)}" for override in range(overrides)])
+            group = config.get("group")
+            group.get("property_a")
+
+            hit = timeit.timeit(lambda: group.get("property_a"), number=LOOKUPS) / LOOKUPS
+            missing = timeit.timeit(lambda: group.get("missing"), number=LOOKUPS) / LOOKUPS
+
+            print(f"{overrides:3} overrides: get {hit * 1e9:8.0f} ns, missing {missing * 1e9:8.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Time needed to build the index of a large config, scanning it with multiple processes.
+
+Scanning should get faster with the number of workers, up to the number of available cores.
+
+    python -m benchmarks.parallel
+"""
+
+import os
+import tempfile
+import time
+
+from configatron.index import Index
+
+from .generate import generate
+
+
+GROUPS = 200000
+PROPERTIES = 10
+WORKERS = [1, 2, 4, 8]
+
+
+def measure(path: str, workers: int) -> float:
+    """Seconds needed to build the index."""
+
+    started = time.perf_counter()
+    Index(path, workers=workers).build(True)
+
+    return time.perf_counter() - started
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.ini")
+        generate(path, GROUPS, PROPERTIES)
+
+        size = os.path.getsize(path) // 1024 // 1024
+        print(f"{size} MiB, {os.cpu_count()} cores")
+
+        for workers in WORKERS:
+            print(f"{workers:3} workers: {measure(path, workers):8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
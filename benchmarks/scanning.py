@@ -0,0 +1,51 @@
+"""
+Scanning throughput, in lines per second, of a large synthetic config: line by line (validating or not) and block by
+block (the default when not validating).
+
+    python -m benchmarks.scanning
+"""
+
+import os
+import tempfile
+import time
+
+from configatron.reader import Reader
+from configatron.scanner import Scanner
+
+from .generate import generate
+
+
+# 1M groups of 9 properties, followed by a blank line: ~11M lines
+GROUPS = 1000000
+PROPERTIES = 9
+
+
+def measure(groups) -> float:
+    """Seconds needed to scan all the groups."""
+
+    started = time.perf_counter()
+    for _ in groups:
+        pass
+
+    return time.perf_counter() - started
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.ini")
+        generate(path, GROUPS, PROPERTIES)
+
+        lines = GROUPS * (PROPERTIES + 2)
+        print(f"{lines} lines, {os.path.getsize(path) // 1024 // 1024} MiB")
+
+        scanner = Scanner(Reader(path))
+        for name, groups in [
+            ("lines, validating", scanner._scan_lines(True)),
+            ("lines", scanner._scan_lines(False)),
+            ("blocks", scanner._scan_blocks()),
+        ]:
+            print(f"{name:>20}: {lines / measure(groups):12.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main()
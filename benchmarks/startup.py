@@ -0,0 +1,58 @@
+"""
+Cold start time of `Configatron(...)`, scanning the config file versus loading its index from a sidecar or attaching
+to a shared index.
+
+    python -m benchmarks.startup
+"""
+
+import os
+import tempfile
+import time
+
+from configatron import Configatron
+
+from .generate import generate
+
+
+GROUPS = [1000, 10000, 100000]
+PROPERTIES = 10
+
+# files modified more recently than this are hashed instead of trusting their modification time
+SETTLE = 2
+
+
+def measure(path: str, sidecar: str = None, shared: str = None) -> float:
+    """Seconds needed to build the initial index."""
+
+    started = time.perf_counter()
+    Configatron(path, sidecar=sidecar, shared=shared)
+
+    return time.perf_counter() - started
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for groups in GROUPS:
+            path = os.path.join(directory, f"config{groups}.ini")
+            sidecar = os.path.join(directory, f"config{groups}.idx")
+            shared = os.path.join(directory, f"config{groups}.shm")
+
+            generate(path, groups, PROPERTIES)
+            mtime = time.time_ns() - SETTLE * 1_000_000_000
+            os.utime(path, ns=(mtime, mtime))
+
+            # save the sidecar and publish the shared index
+            Configatron(path, sidecar=sidecar, shared=shared)
+
+            print(
+                f"{groups:7} groups: "
+                f"scan {measure(path):8.3f}s, "
+                f"sidecar {measure(path, sidecar):8.3f}s, "
+                f"shared {measure(path, shared=shared):8.3f}s, "
+                f"sidecar size {os.path.getsize(sidecar) // 1024:6} KiB, "
+                f"shared size {os.path.getsize(shared) // 1024:6} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Benchmark suite over a synthetic config: index build time and peak memory, cold and warm lookup latencies, re-index cost
+after edits and cache hit ratio. Results are printed as JSON, so they can be stored and compared between releases.
+
+    python -m benchmarks.suite --groups 100000 --properties 10 --overrides 2 --output results.json
+    python -m benchmarks.suite --size 2G --no-memory
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from configatron import Configatron
+from configatron.index import Index
+
+from .generate import generate, generate_size, parse_size
+
+
+# Files modified more recently than this are hashed instead of trusting their modification time.
+SETTLE = 2
+
+
+def percentiles(samples: List[int]) -> Dict[str, float]:
+    """Latency percentiles, in microseconds, from samples in nanoseconds."""
+
+    quantiles = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+    return {
+        "p50": quantiles[49] / 1000,
+        "p90": quantiles[89] / 1000,
+        "p99": quantiles[98] / 1000,
+        "max": max(samples) / 1000,
+    }
+
+
+def timed(call: Callable, *args) -> int:
+    """Nanoseconds spent in a call."""
+
+    started = time.perf_counter_ns()
+    call(*args)
+
+    return time.perf_counter_ns() - started
+
+
+def settle(path: str):
+    """Move the config's modification time back, so its signature can be trusted, like for a config at rest."""
+
+    mtime = time.time_ns() - SETTLE * 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+def measure_build(path: str, memory: bool) -> Dict[str, float]:
+    """Seconds needed to build the index, with and without validation, and the peak memory allocated while building."""
+
+    results = {}
+    for validate in [False, True]:
+        index = Index(path)
+        started = time.perf_counter()
+        index.build(validate)
+        results["validated" if validate else "unvalidated"] = time.perf_counter() - started
+
+    if memory:
+        index = Index(path)
+
+        tracemalloc.start()
+        index.build()
+        _, results["peak_memory"] = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return results
+
+
+def measure_lookups(path: str, overrides: List[str], names: List[str], properties: int) -> Dict[str, Dict[str, float]]:
+    """Latency of looking up groups and their properties, the first time (cold) and once cached (warm)."""
+
+    config = Configatron(path, overrides, cache_options={"size": len(names)}, validate=False)
+    config.index.build()
+
+    lookups = [(name, f"property_{chr(97 + position % min(properties, 26))}") for position, name in enumerate(names)]
+
+    cold = [timed(lambda: config.get(name).get(prop)) for name, prop in lookups]
+    warm = [timed(lambda: config.get(name).get(prop)) for name, prop in lookups]
+
+    groups = [(config.get(name), prop) for name, prop in lookups]
+    group = [timed(group.get, prop) for group, prop in groups]
+
+    return {"cold": percentiles(cold), "warm": percentiles(warm), "group_get": percentiles(group)}
+
+
+def measure_reindex(path: str, names: List[str]) -> Dict[str, Dict[str, float]]:
+    """Seconds needed to refresh the index after a few kinds of edits, and the number of groups that changed."""
+
+    middle = names[len(names) // 2]
+    config = Configatron(path, validate=False)
+    config.index.build()
+    results = {}
+
+    def record(edit: str):
+        started = time.perf_counter()
+        changed = config.refresh()
+        results[edit] = {
+            "seconds": time.perf_counter() - started,
+            "changed": len(config.index.groups_index) if changed is None else len(changed),
+        }
+
+    group = config.index.get(middle)
+
+    # rename a group's first property in place, keeping the file's size
+    with open(path, "r+b") as config_file:
+        config_file.seek(group.start)
+        content = config_file.read(group.end - group.start)
+        config_file.seek(group.start)
+        config_file.write(content.replace(b"property_a", b"property_z", 1))
+    record("edit")
+
+    # insert a property, moving all the groups after it
+    group = config.index.get(middle)
+    temporary = f"{path}.tmp"
+    with open(path, "rb") as source, open(temporary, "wb") as target:
+        target.write(source.read(group.start))
+        target.write(b"inserted = 1\n")
+        shutil.copyfileobj(source, target)
+    os.replace(temporary, path)
+    record("insert")
+
+    # append a new group
+    with open(path, "ab") as config_file:
+        config_file.write(b"[appended]\nvalue = 1\n")
+    record("append")
+
+    return results
+
+
+def measure_cache(path: str, groups: int, cache_size: int, lookups: int, seed: int) -> Dict[str, float]:
+    """Cache hit ratio of a skewed workload, where a few groups are looked up much more often than the others."""
+
+    config = Configatron(path, cache_options={"size": cache_size}, validate=False)
+    config.index.build()
+
+    misses = 0
+    lookup = config.index.get
+
+    def counted(name):
+        nonlocal misses
+        misses += 1
+        return lookup(name)
+
+    config.index.get = counted
+
+    rand = random.Random(seed)
+    names = [f"group{min(int(rand.paretovariate(1)) - 1, groups - 1)}" for _ in range(lookups)]
+
+    started = time.perf_counter()
+    for name in names:
+        config.get(name)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "lookups": lookups,
+        "hit_ratio": 1 - misses / lookups,
+        "lookups_per_second": lookups / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and print its results as JSON.")
+    parser.add_argument("--groups", type=int, default=100000, help="number of groups, unless --size is given")
+    parser.add_argument("--size", type=parse_size, help="size of the config, e.g. 100M or 2G")
+    parser.add_argument("--properties", type=int, default=10, help="number of properties per group")
+    parser.add_argument("--overrides", type=int, default=0, help="number of overridden values of each property")
+    parser.add_argument("--comments", type=int, default=0, help="number of comment lines per group")
+    parser.add_argument("--lookups", type=int, default=10000, help="number of lookups measured")
+    parser.add_argument("--cache-size", type=int, default=1000, help="cache size, for the cache hit ratio")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--no-memory", action="store_true", help="don't trace memory, which slows the build down")
+    parser.add_argument("--output", help="write the results to this file, instead of printing them")
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.ini")
+
+        options = (arguments.properties, arguments.seed, arguments.overrides, arguments.comments)
+        if arguments.size is not None:
+            groups = generate_size(path, arguments.size, *options)
+        else:
+            groups = arguments.groups
+            generate(path, groups, *options)
+
+        settle(path)
+
+        rand = random.Random(arguments.seed)
+        names = [f"group{rand.randrange(groups)}" for _ in range(min(arguments.lookups, groups))]
+        overrides = [f"override_{chr(97 + override % 26)}" for override in range(arguments.overrides)]
+
+        results = {
+            "build": measure_build(path, not arguments.no_memory),
+            "lookups": measure_lookups(path, overrides, names, arguments.properties),
+            "cache": measure_cache(path, groups, arguments.cache_size, arguments.lookups, arguments.seed),
+            "reindex": measure_reindex(path, names),
+        }
+
+        report = {
+            "timestamp": time.time(),
+            "python": platform.python_implementation() + " " + platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "config": {
+                "groups": groups,
+                "size": os.path.getsize(path),
+                "properties": arguments.properties,
+                "overrides": arguments.overrides,
+                "comments": arguments.comments,
+                "seed": arguments.seed,
+            },
+            "results": results,
+        }
+
+    output = json.dumps(report, indent=2)
+    if arguments.output is None:
+        print(output)
+        return
+
+    with open(arguments.output, "w") as results_file:
+        results_file.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Throughput of `Configatron.get(group).get(property)`, with multiple threads reading at the same time.
+
+On interpreters with a global interpreter lock, the total throughput should stay flat as threads are added, instead of
+collapsing because of lock contention. On free-threaded interpreters it should grow with the number of threads.
+
+    python -m benchmarks.threads
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+
+from configatron import Configatron
+
+from .generate import generate
+
+
+GROUPS = 1000
+PROPERTIES = 10
+THREADS = [1, 2, 4, 8]
+SHARDS = [1, 16]
+DURATION = 1
+
+
+def measure(config: Configatron, threads: int) -> int:
+    """Number of property reads per second, from all threads."""
+
+    reads = [0] * threads
+    stop = threading.Event()
+
+    def read(thread: int):
+        rand = random.Random(thread)
+
+        while not stop.is_set():
+            config.get(f"group{rand.randrange(GROUPS)}").get("property_a")
+            reads[thread] += 1
+
+    workers = [threading.Thread(target=read, args=(thread,)) for thread in range(threads)]
+    for worker in workers:
+        worker.start()
+
+    time.sleep(DURATION)
+    stop.set()
+
+    for worker in workers:
+        worker.join()
+
+    return sum(reads) // DURATION
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.ini")
+        generate(path, GROUPS, PROPERTIES)
+
+        for shards in SHARDS:
+            config = Configatron(path, cache_options={"shards": shards})
+
+            # warm up the cache, so only reads are measured
+            for group in range(GROUPS):
+                config.get(f"group{group}").get("property_a")
+
+            for threads in THREADS:
+                print(f"{shards:3} shards, {threads:3} threads: {measure(config, threads):10} reads/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,2 @@
 from .configatron import Configatron
+from .aio import AsyncConfigatron
@@ -0,0 +1,161 @@
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Hashable, Optional, Union
+
+from .configatron import Configatron
+from .nodes.group import MISSING, Group
+from .utils import AsyncEmptyConfig, EmptyConfig
+
+
+class AsyncConfigatron:
+    """
+    Asyncio front end of a `Configatron`, for event loops that can't block on disk reads, hashing or re-indexing.
+
+    Cached groups, recently missing groups and already indexed properties are returned right away, from the event loop.
+    Missing groups only need a stat of the config file, to make sure it didn't change since.
+    Everything else runs in an executor: concurrent lookups of the same group, indexing of the same group and refreshes
+    share a single executor call, and its result. An instance is bound to the event loop that first awaits it.
+    """
+
+    def __init__(self, config: Configatron, executor: Executor = None):
+        """
+        :param config: Configatron to read from, already built.
+        :param executor: Where blocking calls run. Defaults to the event loop's default executor.
+        """
+
+        self.config = config
+        self.executor = executor
+
+        # executor calls in flight, by key, shared by all their awaiters
+        self.pending = {}  # type: Dict[Hashable, asyncio.Future]
+
+    @classmethod
+    async def open(cls, *args, executor: Executor = None, **kwargs) -> "AsyncConfigatron":
+        """
+        Build a `Configatron` in the executor, since the initial index build and validation read the whole file.
+
+        :param args: Configatron's arguments.
+        :param executor: Where blocking calls run. Defaults to the event loop's default executor.
+        :param kwargs: Configatron's keyword arguments.
+        :return: AsyncConfigatron
+        """
+
+        loop = asyncio.get_running_loop()
+        config = await loop.run_in_executor(executor, functools.partial(Configatron, *args, **kwargs))
+
+        return cls(config, executor)
+
+    async def get(self, group_name: str) -> Union["AsyncGroup", AsyncEmptyConfig]:
+        """
+        Return a configuration group, from cache if possible, otherwise loaded from the index in the executor.
+
+        :param group_name:
+        :return: AsyncGroup or AsyncEmptyConfig
+        """
+
+        group = self.config.lru.get(group_name)  # type: Optional[Group]
+        if group:
+            return AsyncGroup(group, self)
+
+        if self.config.is_missing(group_name):
+            return AsyncEmptyConfig()
+
+        group = await self.run(("group", group_name), self.config.load, group_name)
+        if isinstance(group, EmptyConfig):
+            return AsyncEmptyConfig()
+
+        return AsyncGroup(group, self)
+
+    async def refresh(self):
+        """
+        Re-index the config file in the executor, if it changed, and drop stale groups from cache.
+
+        :return: names of the groups that changed or None if the entire file was re-indexed.
+        """
+
+        return await self.run("refresh", self.config.refresh)
+
+    def validation_status(self):
+        """Status of the config's validation. See `Configatron.validation_status`."""
+
+        return self.config.validation_status()
+
+    def stats(self):
+        """Snapshot of the metrics. See `Configatron.stats`."""
+
+        return self.config.stats()
+
+    async def close(self):
+        """
+        Stop watching the config file, if we were, in the executor, since it waits for the watcher's thread.
+
+        :return: None
+        """
+
+        await self.run("close", self.config.close)
+
+    async def run(self, key: Hashable, function: Callable, *args) -> Any:
+        """
+        Call a blocking function in the executor, or wait for the call already in flight for the same key.
+
+        :param key: Identifies calls that can share their result.
+        :param function: Blocking function.
+        :param args: Its arguments.
+        :return: function's result
+        """
+
+        future = self.pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self.pending[key] = loop.run_in_executor(self.executor, functools.partial(function, *args))
+            future.add_done_callback(functools.partial(self.done, key))
+
+        # a cancelled awaiter doesn't cancel the call the others are waiting for
+        return await asyncio.shield(future)
+
+    def done(self, key: Hashable, future: asyncio.Future):
+        """Forget a finished call, so the next one for the same key runs again."""
+
+        if self.pending.get(key) is future:
+            del self.pending[key]
+
+
+class AsyncGroup:
+    """
+    Asyncio front end of a `Group`. Properties that aren't indexed yet are read in the executor.
+    """
+
+    __slots__ = ("group", "config")
+
+    def __init__(self, group: Group, config: AsyncConfigatron):
+        self.group = group
+        self.config = config
+
+    @property
+    def name(self) -> str:
+        return self.group.name
+
+    async def get(self, name: str):
+        """
+        Return property's value. If the group doesn't have it, index the group in the executor first, sharing the
+        indexing with other lookups of the same group.
+
+        :param name: Property name.
+        :return: Property's value or AsyncEmptyConfig.
+        """
+
+        group = self.group
+
+        # indexed or recently missing properties don't need any read
+        if group.properties.get(name, MISSING) is MISSING:
+            negative = group.scanner.negative
+            if negative is None or not negative.contains((group.name, name)):
+                await self.config.run(("index", id(group)), group.index)
+                value = group.get(name, indexed=True)
+            else:
+                value = EmptyConfig()
+        else:
+            value = group.get(name)
+
+        return AsyncEmptyConfig() if isinstance(value, EmptyConfig) else value
@@ -1,20 +1,48 @@
-from typing import Dict, Union, List
+from typing import Any, Callable, Dict, Optional, Union, List
 
+from .digests import DEFAULT_DIGEST
+from .errors import ValidationError
 from .index import Index
-from .lru import LRUCache
+from .lru import LRUCache, NegativeCache, ShardedLRUCache
+from .metrics import Metrics
 from .nodes.group import Group
 from .utils import EmptyConfig
+from .validator import Validator
+from .watcher import Watcher
 
 
 DEFAULT_CACHE_OPTIONS = {
     "size": 10000,  # number of items in cache, default 10 000 items
     "lifespan": 60 * 60,  # seconds for each item in cache, default 1h
+    "negative_size": 10000,  # number of missing groups and properties to remember, default 10 000 items
+    "negative_lifespan": 60,  # seconds to remember a missing group or property, default 1m
+    "shards": 1,  # split the cache in multiple, independently locked, caches, for multi-threaded access
+}
+
+DEFAULT_WATCH_OPTIONS = {
+    "backend": "auto",  # inotify, if available, or poll
+    "interval": 1,  # seconds between polls, default 1s
 }
 
 
 class Configatron:
     def __init__(
-        self, source: str, overrides: List[str] = None, cache_options: Dict[str, str] = None, validate: bool = True
+        self,
+        source: str,
+        overrides: List[str] = None,
+        cache_options: Dict[str, str] = None,
+        validate: Union[bool, str] = True,
+        reader: str = "file",
+        watch: bool = False,
+        watch_options: Dict[str, Any] = None,
+        sidecar: str = None,
+        workers: int = 1,
+        engine: str = "dict",
+        shared: str = None,
+        validation_callback: Callable[[Optional[ValidationError]], None] = None,
+        digest: str = DEFAULT_DIGEST,
+        metrics: bool = False,
+        metrics_hook: Callable[[str, float], None] = None,
     ):
         """
         Instantiate the two main components: index and LRU cache.
@@ -22,32 +50,152 @@ class Configatron:
 
         :param source: Path to config file.
         :param overrides: Some properties can be overwritten, based on specific overrides.
-        :param cache_options: Configure cache's size and lifespan.
-        :param validate: Throw exception if the syntax of the config file is not valid.
+        :param cache_options: Configure cache's size and lifespan, for existing and for missing items.
+        :param validate: Throw exception if the syntax of the config file is not valid. With `background`, the config
+            is indexed right away and validated in a background thread, every time it changes.
+        :param reader: How to read the config file: `file` (open and read it on demand) or `mmap` (map it in memory).
+        :param watch: Re-index in a background thread when the config file changes, instead of on access.
+        :param watch_options: Configure the watcher's backend and polling interval.
+        :param sidecar: Path to a file where the index is saved and loaded from, instead of scanning the config file.
+            It's rewritten entirely every time the config is re-indexed.
+        :param workers: Number of processes scanning large config files in parallel.
+        :param engine: How to store the index: `dict` (an object for each group) or `columnar` (compact arrays, for
+            configs with millions of groups).
+        :param shared: Path to a columnar index shared by all processes: one of them builds it, the others map it in
+            memory, read-only. Each re-index publishes the entire index again.
+        :param validation_callback: Called with the validation error, or None, after each background validation.
+        :param digest: Hash used to detect changes in the config file and in each group: `sha256`, `blake2b`,
+            `blake2b-8` (8 bytes digests) or the cheaper, but weaker, `crc32` and `adler32` checksums.
+        :param metrics: Count and time cache lookups, index builds, reads, hashing, scans and group indexing.
+        :param metrics_hook: Called with each metric's name and increment, every time it's updated. Enables metrics.
         """
 
         if overrides:
             overrides = overrides[::-1]
 
-        self.index = Index(source, overrides)
-
         if cache_options is None:
             cache_options = DEFAULT_CACHE_OPTIONS
 
+        # disabled metrics are None, so instrumented code skips them with a single check
+        self.metrics = Metrics(metrics_hook) if metrics or metrics_hook is not None else None
+
         self.cache_options = {**DEFAULT_CACHE_OPTIONS, **cache_options}
-        self.lru = LRUCache(self.cache_options["size"], self.cache_options["lifespan"])
+        if self.cache_options["shards"] > 1:
+            self.lru = ShardedLRUCache(
+                self.cache_options["size"],
+                self.cache_options["lifespan"],
+                self.cache_options["shards"],
+                self.metrics,
+            )
+        else:
+            self.lru = LRUCache(self.cache_options["size"], self.cache_options["lifespan"], self.metrics)
+        self.negative = NegativeCache(
+            self.cache_options["negative_size"], self.cache_options["negative_lifespan"], self.metrics
+        )
+
+        self.validate = validate
+        if validate not in {True, False, "background"}:
+            raise RuntimeError(f"Unknown validation mode {validate}, expected one of: True, False, background")
+
+        self.index = Index(
+            source, overrides, reader, self.negative, sidecar, workers, engine, shared, digest, self.metrics
+        )
 
         # build the initial index and validate the config as well
-        if validate:
+        self.validator = None
+        if validate == "background":
+            self.validator = Validator(self.index, validation_callback)
+            self.refresh()
+        elif validate:
             self.index.build(True)
 
+        self.watcher = None
+        if watch:
+            # the watcher keeps the index up to date, so build it now instead of on the first access
+            if validate is False:
+                self.index.build()
+
+            self.watch_options = {**DEFAULT_WATCH_OPTIONS, **(watch_options or {})}
+            self.watcher = Watcher(source, self.refresh, **self.watch_options)
+            self.watcher.start()
+
+    def refresh(self):
+        """
+        Re-index the config file, if it changed, and drop stale groups from cache.
+
+        :return: names of the groups that changed or None if the entire file was re-indexed.
+        """
+
+        indexed = self.index.groups_index
+        changed = self.index.build()
+
+        # Groups can move without changing, so any new index means the file changed. Every indexed group is bound to the
+        # new snapshot of the file, so cached groups are replaced with their new version, keeping their resolved
+        # properties, and they don't hold the previous snapshot open. Groups whose content changed are dropped.
+        if self.index.groups_index is not indexed:
+            self.lru.refresh(self._inherit)
+
+            # the config changed since it was last validated
+            if self.validator is not None:
+                self.validator.start()
+
+        return changed
+
+    def _inherit(self, name: str, group: Group) -> Optional[Group]:
+        """New version of a cached group, if its content didn't change."""
+
+        current = self.index.get(name)
+        if current is None or not current.inherit(group):
+            return None
+
+        return current
+
+    def validation_status(self) -> Dict[str, Optional[str]]:
+        """
+        Status of the config's validation: disabled, pending, valid, invalid or failed (the config couldn't be read),
+        and the validation error, if any.
+
+        :return: dict
+        """
+
+        if self.validator is not None:
+            return self.validator.stats()
+
+        return {"status": "valid" if self.validate else "disabled", "error": None}
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Snapshot of the metrics, if they're enabled: cache and negative cache hits, misses, expirations and evictions,
+        full, incremental and skipped index builds, bytes read, indexed groups and time spent building the index,
+        scanning, hashing and indexing groups (in seconds).
+
+        :return: metrics, by name, or an empty dict if they're disabled
+        """
+
+        if self.metrics is None:
+            return {}
+
+        return self.metrics.stats()
+
+    def close(self):
+        """
+        Stop watching the config file, if we were.
+
+        :return: None
+        """
+
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+
     def get(self, group_name: str) -> Union[Group, EmptyConfig]:
         """
         Return a configuration group.
 
         Search in the local LRU cache for it. If missing, try to retrieve it from the index.
-        Re-index if the group was updated offline or if the group is not in the index.
-        If found, update cache. Otherwise, return an EmptyConfig.
+        Re-index if the group was updated offline or if the group is not in the index, unless the config file is
+        watched and re-indexed in background.
+        If found, update cache. Otherwise, remember it's missing and return an EmptyConfig.
 
         :param group_name:
         :return: Group or EmptyConfig
@@ -58,19 +206,55 @@ class Configatron:
         if group:
             return group
 
+        # Group was recently looked up and it was missing.
+        if self.is_missing(group_name):
+            return EmptyConfig()
+
+        return self.load(group_name)
+
+    def is_missing(self, group_name: str) -> bool:
+        """
+        Check if a group was recently looked up and it was missing, and the config file didn't change since. Watched
+        files are re-indexed as soon as they change, which forgets missing groups, so they're not checked.
+
+        :param group_name:
+        :return: bool
+        """
+
+        if not self.negative.contains(group_name):
+            return False
+
+        return self.watcher is not None or self.index.is_current()
+
+    def load(self, group_name: str) -> Union[Group, EmptyConfig]:
+        """
+        Retrieve a group from the index, without looking it up in cache first, and cache it. Reads the config file and
+        may re-index it, so `AsyncConfigatron` runs it in an executor, on cache misses.
+
+        :param group_name:
+        :return: Group or EmptyConfig
+        """
+
+        generation = self.index.generation
+
         # Group may be newly added to the file or its configuration have been updated, so we can re-index.
         group = self.index.get(group_name)
-        if not group or not group.is_fresh:
-            self.index.build()
+        if self.watcher is None and (not group or not self.index.is_fresh(group)):
+            self.refresh()
 
-            # Purge the entire cache if the file was re-indexed
-            self.lru.purge()
-
-            # If the group was deleted, return an infinite empty dict.
+            generation = self.index.generation
             group = self.index.get(group_name)
-            if not group:
-                return EmptyConfig()
+
+        # If the group was deleted, return an infinite empty dict.
+        if not group:
+            self.negative.add(group_name)
+            return EmptyConfig()
 
         self.lru.put(group.name, group)
 
+        # a build finished in the meantime may have refreshed the cache before the group was put in it
+        if self.index.generation != generation:
+            self.lru.refresh(self._inherit, [group.name])
+            return self.get(group_name)
+
         return group
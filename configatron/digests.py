@@ -0,0 +1,40 @@
+import functools
+import hashlib
+import zlib
+
+
+class Checksum:
+    """
+    Running zlib checksum, fed block by block like hashlib's hashes. Much cheaper than a cryptographic hash, but only
+    4 bytes long, so unrelated changes are more likely to go unnoticed.
+    """
+
+    __slots__ = ("function", "value")
+
+    digest_size = 4
+
+    def __init__(self, function, value: int):
+        self.function = function
+        self.value = value
+
+    def update(self, data: bytes):
+        self.value = self.function(data, self.value)
+
+    def digest(self) -> bytes:
+        return self.value.to_bytes(self.digest_size, "big")
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+
+# Hashes used to detect changes in the source and in each group, by name. Names fit in 16 bytes, since they're saved in
+# sidecars and shared indexes, and digests in 64 bytes.
+DIGESTS = {
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+    "blake2b-8": functools.partial(hashlib.blake2b, digest_size=8),
+    "crc32": functools.partial(Checksum, zlib.crc32, 0),
+    "adler32": functools.partial(Checksum, zlib.adler32, 1),
+}
+
+DEFAULT_DIGEST = "sha256"
@@ -0,0 +1,401 @@
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from configatron.errors import ValidationError
+from configatron.nodes.group import Group
+
+
+# Largest offset that fits in the table's compact columns.
+MAX_COMPACT_OFFSET = 0xFFFFFFFF
+
+# Number of re-indexes spliced over an index, before it's built again from all its groups.
+MAX_SPLICES = 4
+
+
+class GroupDict(dict):
+    """
+    Groups index, mapping each group's name to its group. Groups are kept in the order they are found in the file.
+    """
+
+    @classmethod
+    def build(cls, scanner: "Scanner", groups: Iterable[Group], validate: bool = False) -> Tuple["GroupDict", bool]:
+        """
+        Build a new index from the given groups.
+
+        :param scanner: Scanner over the snapshot the groups were found in.
+        :param groups: groups, in the order they are found in the file.
+        :param validate: raise validation errors if we find duplicate groups.
+        :return: new index and whether some groups are hidden by duplicates
+        """
+
+        groups_index = cls()
+        shadowed = False
+
+        for group in groups:
+            if group.name in groups_index:
+                if validate:
+                    raise ValidationError(f"Duplicate group name: {group.name}")
+
+                # hidden by the last one, which moves to its position in the file
+                del groups_index[group.name]
+                shadowed = True
+
+            groups_index[group.name] = group
+
+        return groups_index, shadowed
+
+    def ordered(self) -> Sequence[Group]:
+        """
+        Groups, in the order they are found in the file.
+
+        :return: groups
+        """
+
+        return list(self.values())
+
+
+class GroupTable(Mapping):
+    """
+    Compact groups index, for configs with millions of groups.
+
+    Names are concatenated in a single buffer and looked up with a binary search, over their positions sorted by name.
+    Byte ranges and digests are kept in parallel columns, in the order they are found in the file. Groups are created
+    only when they're looked up, so they don't keep their indexed properties: those are kept by the cache.
+
+    Columns are arrays or, for shared indexes, memory views over a file mapped in memory.
+    """
+
+    def __init__(
+        self,
+        scanner: "Scanner",
+        names: bytes,
+        offsets: array,
+        by_name: array,
+        headers: array,
+        starts: array,
+        ends: array,
+        digests: bytes,
+        digest_size: int,
+    ):
+        self.scanner = scanner
+
+        # names, in file order, and where each one starts in the buffer (plus where the last one ends)
+        self.names = names
+        self.offsets = offsets
+
+        # positions, sorted by the group's name
+        self.by_name = by_name
+
+        self.headers = headers
+        self.starts = starts
+        self.ends = ends
+
+        self.digests = digests
+        self.digest_size = digest_size
+
+    @classmethod
+    def build(cls, scanner: "Scanner", groups: Iterable[Group], validate: bool = False) -> Tuple["GroupTable", bool]:
+        """
+        Build a new index from the given groups.
+
+        :param scanner: Scanner over the snapshot the groups were found in.
+        :param groups: groups, in the order they are found in the file.
+        :param validate: raise validation errors if we find duplicate groups.
+        :return: new index and whether some groups are hidden by duplicates
+        """
+
+        names, digests = [], []
+        headers, starts, ends = array("Q"), array("Q"), array("Q")
+
+        for group in groups:
+            names.append(group.name.encode())
+            headers.append(group.header)
+            starts.append(group.start)
+            ends.append(group.end)
+            digests.append(group._hash)
+
+        # the sort is stable, so duplicates are sorted in file order and the last one hides the others
+        by_name = sorted(range(len(names)), key=names.__getitem__)
+        duplicates = [
+            (position, following)
+            for position, following in zip(by_name, by_name[1:])
+            if names[position] == names[following]
+        ]
+
+        if duplicates and validate:
+            # report the same duplicate as a scan would: the first one found in the file
+            duplicate = min(following for _, following in duplicates)
+            raise ValidationError(f"Duplicate group name: {names[duplicate].decode()}")
+
+        if duplicates:
+            hidden = {position for position, _ in duplicates}
+            kept = [position for position in range(len(names)) if position not in hidden]
+
+            names = [names[position] for position in kept]
+            digests = [digests[position] for position in kept]
+            headers, starts, ends = (
+                array("Q", (column[position] for position in kept)) for column in (headers, starts, ends)
+            )
+
+            by_name = sorted(range(len(names)), key=names.__getitem__)
+
+        offsets = array("Q", [0])
+        for name in names:
+            offsets.append(offsets[-1] + len(name))
+
+        # most files are small enough for 4 bytes offsets
+        typecode = "I" if not ends or ends[-1] <= MAX_COMPACT_OFFSET else "Q"
+        columns = (array(typecode, column) for column in (offsets, by_name, headers, starts, ends))
+
+        digest_size = len(digests[0]) if digests else 0
+
+        return cls(scanner, b"".join(names), *columns, b"".join(digests), digest_size), bool(duplicates)
+
+    def _name(self, position: int) -> bytes:
+        return bytes(self.names[self.offsets[position] : self.offsets[position + 1]])
+
+    def columns(self) -> Tuple[Sequence[int], ...]:
+        """
+        Offsets of the names, positions sorted by name, headers, starts and ends of the groups.
+
+        :return: columns
+        """
+
+        return self.offsets, self.by_name, self.headers, self.starts, self.ends
+
+    def _group(self, position: int) -> Group:
+        """Create the group found at a position in the file's order of groups."""
+
+        group = Group(
+            self.scanner,
+            self._name(position).decode(),
+            self.starts[position],
+            self.scanner.overrides,
+            self.headers[position],
+        )
+
+        digest = bytes(self.digests[position * self.digest_size : (position + 1) * self.digest_size])
+        group.ends(self.ends[position], digest)
+
+        return group
+
+    def __getitem__(self, name: str) -> Group:
+        key = name.encode()
+
+        low, high = 0, len(self.by_name)
+        while low < high:
+            middle = (low + high) // 2
+            current = self._name(self.by_name[middle])
+
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                return self._group(self.by_name[middle])
+
+        raise KeyError(name)
+
+    def __iter__(self) -> Iterator[str]:
+        for position in range(len(self)):
+            yield self._name(position).decode()
+
+    def __len__(self) -> int:
+        return len(self.headers)
+
+    def values(self) -> Iterator[Group]:
+        for position in range(len(self)):
+            yield self._group(position)
+
+    def ordered(self) -> Sequence[Group]:
+        """
+        Groups, in the order they are found in the file. Groups are created only when they're accessed.
+
+        :return: groups
+        """
+
+        return GroupSequence(self)
+
+
+class GroupSplice(Mapping):
+    """
+    Index updated by a re-index, without touching the groups that didn't change.
+
+    Groups of the previous index are kept before and after the region that was scanned again, and the groups found in
+    that region are spliced in between. Groups after the region moved by the same number of bytes, so the offset is
+    applied only when they're accessed. Groups are created on access, bound to the new snapshot, like in a table.
+
+    Splices are stacked over each other by the following re-indexes. Previous indexes keep their own groups, and the
+    snapshots those are bound to, so the stack is built again from all its groups once it's `MAX_SPLICES` deep.
+    """
+
+    def __init__(
+        self,
+        scanner: "Scanner",
+        base: Mapping,
+        head: int,
+        tail: int,
+        start: int,
+        end: int,
+        shift: int,
+        groups: GroupDict,
+    ):
+        """
+        :param scanner: Scanner over the new snapshot.
+        :param base: Previous index.
+        :param head: Number of groups kept from the start of the previous index.
+        :param tail: Position of the first group kept after the region, in the previous index.
+        :param start: Start of the region in the previous version of the file, the header of the first replaced group.
+        :param end: End of the region in the previous version of the file, the header of the first moved group.
+        :param shift: Number of bytes the groups after the region moved with.
+        :param groups: Groups found in the region of the new version of the file.
+        """
+
+        self.scanner = scanner
+
+        self.base = base
+        self.head, self.tail = head, tail
+        self.start, self.end = start, end
+        self.shift = shift
+
+        self.groups = groups
+        self.scanned = list(groups.values())
+
+        self.depth = base.depth + 1 if isinstance(base, GroupSplice) else 1
+        self.size = head + len(self.scanned) + len(base) - tail
+
+        # Consecutive groups of the same index, in file order: groups, range of positions and the number of bytes they
+        # moved. Groups are found by position, or walked, without going through the previous splices.
+        runs = base.runs if isinstance(base, GroupSplice) else [(base.ordered(), 0, len(base), 0)]
+        self.runs = (
+            _cut(runs, 0, head)
+            + _cut([(self.scanned, 0, len(self.scanned), 0)], 0, len(self.scanned))
+            + [(run, first, last, moved + shift) for run, first, last, moved in _cut(runs, tail, len(base))]
+        )
+
+        # position of each run's first group
+        self.positions, position = [], 0
+        for _, first, last, _ in self.runs:
+            self.positions.append(position)
+            position += last - first
+
+    def _find(self, name: str) -> Optional[Tuple[Group, int]]:
+        """Find a group by name, and the number of bytes it moved since it was found."""
+
+        group = self.groups.get(name)
+        if group is not None:
+            return group, 0
+
+        if isinstance(self.base, GroupSplice):
+            found = self.base._find(name)
+        else:
+            group = self.base.get(name)
+            found = None if group is None else (group, 0)
+
+        if found is None:
+            return None
+
+        group, shift = found
+        header = group.header + shift
+        if header < self.start:
+            return found
+
+        # replaced by the groups scanned again
+        if header < self.end:
+            return None
+
+        return group, shift + self.shift
+
+    def _bind(self, group: Group, shift: int) -> Group:
+        """Group bound to the new snapshot, at its current position."""
+
+        if shift == 0 and group.scanner is self.scanner:
+            return group
+
+        return group.moved(self.scanner, shift)
+
+    def _group(self, position: int) -> Group:
+        """Create the group found at a position in the file's order of groups."""
+
+        run = bisect_right(self.positions, position) - 1
+        groups, start, _, shift = self.runs[run]
+
+        return self._bind(groups[start + position - self.positions[run]], shift)
+
+    def get(self, name: str, default=None) -> Optional[Group]:
+        found = self._find(name)
+        return default if found is None else self._bind(*found)
+
+    def __getitem__(self, name: str) -> Group:
+        found = self._find(name)
+        if found is None:
+            raise KeyError(name)
+
+        return self._bind(*found)
+
+    def __contains__(self, name) -> bool:
+        return self._find(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for groups, start, stop, _ in self.runs:
+            for position in range(start, stop):
+                yield groups[position].name
+
+    def __len__(self) -> int:
+        return self.size
+
+    def values(self) -> Iterator[Group]:
+        # runs are walked by position, since slicing a table's groups creates all of them
+        for groups, start, stop, shift in self.runs:
+            for position in range(start, stop):
+                yield self._bind(groups[position], shift)
+
+    def ordered(self) -> Sequence[Group]:
+        """
+        Groups, in the order they are found in the file. Groups are created only when they're accessed.
+
+        :return: groups
+        """
+
+        return GroupSequence(self)
+
+
+def _cut(runs: List[Tuple[Sequence[Group], int, int, int]], first: int, last: int):
+    """Runs of groups between two positions, skipping empty ones."""
+
+    cut, position = [], 0
+    for groups, start, stop, shift in runs:
+        low, high = max(first - position, 0), min(last - position, stop - start)
+        if low < high:
+            cut.append((groups, start + low, start + high, shift))
+
+        position += stop - start
+
+    return cut
+
+
+class GroupSequence(Sequence):
+    """Groups of a table or of a splice, in file order, created on access."""
+
+    def __init__(self, table: Mapping):
+        self.table = table
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self.table._group(index) for index in range(*position.indices(len(self)))]
+
+        if position < 0:
+            position += len(self)
+
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+
+        return self.table._group(position)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+
+ENGINES = {"dict": GroupDict, "columnar": GroupTable}
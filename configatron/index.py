@@ -1,69 +1,744 @@
-import hashlib
 import logging
-from typing import Optional, List
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, Iterable, Mapping, Optional, List, Sequence, Set, Tuple
 
-from configatron.errors import ValidationError
+from configatron.digests import DEFAULT_DIGEST, DIGESTS
+from configatron.engines import ENGINES, MAX_SPLICES, GroupDict, GroupSplice
+from configatron.lru import NegativeCache
+from configatron.metrics import Metrics
 from configatron.nodes.group import Group
-from configatron.reader import Reader
+from configatron.reader import READERS, Reader
 from configatron.scanner import Scanner
+from configatron.shared import Generation, SharedIndex
+from configatron.sidecar import Sidecar
+
+
+# Number and size of the blocks hashed to detect changes, before hashing the entire source.
+SAMPLES = 16
+SAMPLE_SIZE = 4096
+
+# Files modified within this interval (nanoseconds) could still change without their modification time changing.
+RACY_INTERVAL = 2_000_000_000
+
+# Regions smaller than this (bytes) are not worth scanning in a separate process.
+MIN_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Size of the chunks hashed to find the region that changed, when re-indexing.
+CHANGE_CHUNK_SIZE = 64 * 1024
+
+
+def _scan(source: str, start: int, end: int, validate: bool, digest: str) -> List[Tuple[str, int, int, int, bytes]]:
+    """
+    Scan a region of the source, in a worker process.
+
+    :param source: Config filepath.
+    :param start: start byte, the start of a group's header or of the file
+    :param end: end byte, the start of a group's header or the end of file
+    :param validate: raise validation errors if we find invalid configurations.
+    :param digest: Name of the hash used for groups' content.
+    :return: (name, header, start, end, digest) of the groups found in the region
+    """
+
+    scanner = Scanner(Reader(source), digest=digest)
+    return [
+        (group.name, group.header, group.start, group.end, group._hash)
+        for group in scanner.groups(validate, start, end)
+    ]
+
+
+def _common(digests: List[bytes], previous: List[bytes]) -> int:
+    """Number of leading digests that are the same in both lists."""
+
+    common = 0
+    while common < min(len(digests), len(previous)) and digests[common] == previous[common]:
+        common += 1
+
+    return common
+
+
+def _count(groups: Sequence[Group], key: Callable[[Group], int], value: int) -> int:
+    """Number of groups, sorted by key, whose key is less than the value."""
+
+    low, high = 0, len(groups)
+    while low < high:
+        middle = (low + high) // 2
+        if key(groups[middle]) < value:
+            low = middle + 1
+        else:
+            high = middle
+
+    return low
 
 
 class Index:
-    def __init__(self, source: str, overrides: List[str] = None):
+    def __init__(
+        self,
+        source: str,
+        overrides: List[str] = None,
+        reader: str = "file",
+        negative: NegativeCache = None,
+        sidecar: str = None,
+        workers: int = 1,
+        engine: str = "dict",
+        shared: str = None,
+        digest: str = DEFAULT_DIGEST,
+        metrics: Metrics = None,
+    ):
         # Config source, filepath.
         self.source = source
 
-        # Keep the source's last modified time so we don't need to re-index the file if it hasn't changed.
+        # Keep the source's last modified time, size and inode so we don't need to re-index the file if it hasn't
+        # changed. Keep a hash over a sample of its content and, if it was needed, a hash over all its content.
+        self.source_signature = None
+        self.source_sample = None
         self.source_cache_key = None
 
-        # Current groups index. It maps the group's name to it's (start byte, end byte, content sha)
-        self.groups_index = {}
+        # Shared indexes are mapped in memory as they are, so they can only be columnar.
+        self.shared = SharedIndex(shared) if shared else None
+        if self.shared is not None:
+            engine = "columnar"
+
+        if engine not in ENGINES:
+            raise RuntimeError(f"Unknown index engine {engine}, expected one of: {', '.join(ENGINES)}")
+
+        # Current groups index. It maps the group's name to it's (start byte, end byte, content sha), stored either as
+        # group objects or in compact columns.
+        self.engine = engine
+        self.groups_index, _ = ENGINES[engine].build(None, [])
+
+        # Hash of the content before the first group, so changes to it can be detected without a full scan.
+        self.preamble_hash = None
+
+        # Size of the indexed version of the source and hashes over its chunks, aligned to its start and to its end, so
+        # the region that changed can be found without reading every group.
+        self.source_chunks = None
+
+        # Duplicated groups (when not validating) are hidden by the last one, leaving gaps in the index.
+        self.shadowed = False
+
+        # Whether all the indexed groups were validated.
+        self.validated = False
+
+        # Index saved on disk, loaded on the first build instead of scanning the entire file.
+        self.sidecar = Sidecar(sidecar) if sidecar else None
+
+        # Large regions are split and scanned in multiple processes.
+        self.workers = workers
+
+        # Only one thread builds the index at a time. Threads waiting for it reuse its result.
+        self.lock = threading.Lock()
+        self.generation = 0
 
-        self.scanner = Scanner(Reader(source), overrides)
+        if reader not in READERS:
+            raise RuntimeError(f"Unknown reader {reader}, expected one of: {', '.join(READERS)}")
 
-    def _compute_source_key(self) -> str:
+        # The same hash detects changes in the source and in each group.
+        if digest not in DIGESTS:
+            raise RuntimeError(f"Unknown digest {digest}, expected one of: {', '.join(DIGESTS)}")
+
+        self.digest = digest
+        self.hasher = DIGESTS[digest]
+
+        # Missing groups and properties, purged every time the index changes.
+        self.negative = negative
+        self.overrides = overrides
+
+        # Each build scans a snapshot of the file. Its groups keep reading from that snapshot, even if the file is
+        # replaced, until they're swapped out by a new build.
+        self.reader = READERS[reader](source, metrics=metrics)
+
+        # Builds, scans and hashes are counted and timed, if enabled.
+        self.metrics = metrics
+        self.scanner = Scanner(self.reader, overrides, negative, digest)
+
+    @staticmethod
+    def _compute_source_signature(stat: os.stat_result) -> Optional[Tuple[int, int, int]]:
+        """
+        Cheap signature of the source, based only on its metadata.
+
+        Files changed in the same clock tick as the last build can keep the same modification time, so a signature
+        too close to the current time is not trusted.
+
+        :param stat: Source's stat result.
+        :return: (modification time, size, inode) or None, if it can't be trusted.
+        """
+
+        if time.time_ns() - stat.st_mtime_ns < RACY_INTERVAL:
+            return None
+
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    @staticmethod
+    def _compute_source_identity(stat: os.stat_result) -> Tuple[int, int]:
+        """
+        Identify the file behind the source, which changes when it's replaced by another file.
+
+        :param stat: Source's stat result.
+        :return: (device, inode)
+        """
+
+        return stat.st_dev, stat.st_ino
+
+    def _compute_source_sample(self, reader: Reader) -> str:
         """
-        Compute a blake2b hash over source's content.
+        Compute a hash over a few evenly spaced blocks of the source and its size.
+        Different samples mean the content changed, but equal samples don't mean the content is the same.
+
+        :param reader: Reader over a snapshot of the source.
+        :return: Source's sampled hash.
+        """
+
+        started = time.perf_counter() if self.metrics is not None else None
+        _hash = self.hasher()
 
+        size = reader.stat().st_size
+        _hash.update(str(size).encode())
+
+        for sample in range(SAMPLES):
+            start = max(size - SAMPLE_SIZE, 0) * sample // (SAMPLES - 1)
+            _hash.update(reader.block(start, start + SAMPLE_SIZE))
+
+        if started is not None:
+            self.metrics.add("hash.seconds", time.perf_counter() - started)
+
+        return _hash.hexdigest()
+
+    def _compute_source_key(self, reader: Reader) -> str:
+        """
+        Compute a hash over source's content.
+
+        :param reader: Reader over a snapshot of the source.
         :return: Source's content hash.
         """
-        _hash = hashlib.blake2b()
+        started = time.perf_counter() if self.metrics is not None else None
+        _hash = self.hasher()
+
+        for chunk in reader.chunks():
+            _hash.update(chunk)
 
-        with open(self.source, "rb") as f:
-            while chunk := f.read(8192):
-                _hash.update(chunk)
+        if started is not None:
+            self.metrics.add("hash.seconds", time.perf_counter() - started)
 
         return _hash.hexdigest()
 
-    def _should_index(self):
+    def _compute_source_chunks(self, reader: Reader) -> Tuple[int, List[bytes], List[bytes]]:
         """
-        Indexing the entire file can be really costly. We want to avoid this operation as much as possible.
+        Compute hashes over fixed size chunks of the source. Chunks aligned to its start stay in place if the content
+        before them doesn't change, and chunks aligned to its end stay the same if the content after them doesn't.
+
+        :param reader: Reader over a snapshot of the source.
+        :return: source's size, hashes of its chunks from the start and hashes of its chunks from the end.
         """
 
-        return self.source_cache_key != self._compute_source_key()
+        started = time.perf_counter() if self.metrics is not None else None
+
+        size = reader.stat().st_size
+        digests = []
+        for bounds in (
+            ((start, start + CHANGE_CHUNK_SIZE) for start in range(0, size, CHANGE_CHUNK_SIZE)),
+            ((max(end - CHANGE_CHUNK_SIZE, 0), end) for end in range(size, 0, -CHANGE_CHUNK_SIZE)),
+        ):
+            chunks = []
+            for start, end in bounds:
+                _hash = self.hasher()
+                _hash.update(reader.block(start, end))
+                chunks.append(_hash.digest())
+
+            digests.append(chunks)
+
+        if started is not None:
+            self.metrics.add("hash.seconds", time.perf_counter() - started)
+
+        return size, digests[0], digests[1]
+
+    def _compute_preamble_hash(self, scanner: Scanner) -> Optional[bytes]:
+        """
+        Compute a hash over the content that comes before the first group.
+
+        :param scanner: Scanner over a snapshot of the source.
+        :return: Preamble's hash or None, if there are no groups.
+        """
+
+        if not self.groups_index:
+            return None
+
+        # groups are indexed in the order they are found in the file
+        first = next(iter(self.groups_index.values())).header
+        return scanner.compute_hash(0, first).digest()
 
-    def build(self, validate: bool = False):
+    def build(self, validate: bool = False) -> Optional[Set[str]]:
         """
         Parse the entire file and index groups. Store group name as key and a tuple
          (start byte, end byte and content sha)
         as value.
 
+        If the file was already indexed, try to re-scan only the regions that changed.
+        The new index is swapped in once it's complete, so it can be read from other threads while being built.
+
+        Groups can move without changing, so the index may be swapped even if no names are returned.
+
         :param validate: raise validation errors if we find invalid configurations.
+        :return: names of the groups that changed or None if the entire file was re-indexed.
         """
 
-        if not self._should_index():
+        generation = self.generation
+        with self.lock:
+            if generation != self.generation:
+                logging.debug(f"{self.source} was indexed while waiting.")
+
+                if self.metrics is not None:
+                    self.metrics.add("index.builds.skipped")
+
+                return set()
+
+            started = time.perf_counter() if self.metrics is not None else None
+            indexed = self.groups_index
+            try:
+                changed = self._build(validate)
+            finally:
+                self.generation += 1
+
+            if started is not None:
+                kind = "full" if changed is None else "incremental" if self.groups_index is not indexed else "skipped"
+                self.metrics.add(f"index.builds.{kind}")
+                self.metrics.add("index.build.seconds", time.perf_counter() - started)
+
+            return changed
+
+    def _build(self, validate: bool = False) -> Optional[Set[str]]:
+        """Build the index, while holding the lock."""
+
+        # Indexing the entire file can be really costly. We want to avoid this operation as much as possible, so
+        # check if the source changed in layers: its metadata, a sample of its content and only then all its content.
+        signature = self._compute_source_signature(self.reader.stat())
+        if signature is not None and signature == self.source_signature:
             logging.debug(f"Nothing to index for {self.source}.")
-            return
+            return set()
+
+        # from now on, read only from this version of the file
+        scanner = Scanner(self.reader.snapshot(), self.overrides, self.negative, self.digest)
+        signature = self._compute_source_signature(scanner.reader.stat())
+
+        if self.shared is None:
+            return self._update(scanner, signature, validate)
+
+        # another process may have already built it
+        if self._attach(scanner, signature, validate):
+            return None
+
+        # or it may be building it, so wait for it before building it ourselves
+        with self.shared.lock():
+            if self._attach(scanner, signature, validate):
+                return None
+
+            return self._update(scanner, signature, validate)
+
+    def _update(self, scanner: Scanner, signature: Optional[Tuple[int, int, int]], validate: bool = False):
+        """Update the index for a new snapshot of the source."""
+
+        if not self.groups_index and self.sidecar is not None and self._load(scanner, signature, validate):
+            logging.debug(f"Loaded the index of {self.source} from {self.sidecar.path}.")
+            return None
+
+        sample, source_key = self._compute_source_sample(scanner.reader), None
+        if sample == self.source_sample:
+            source_key = self._compute_source_key(scanner.reader)
+
+            if source_key == self.source_cache_key:
+                logging.debug(f"Nothing to index for {self.source}.")
+                self.source_signature = signature
+                return set()
+
+        started = time.perf_counter() if self.metrics is not None else None
+
+        chunks = self._compute_source_chunks(scanner.reader)
+
+        changed = self._reindex(scanner, chunks, validate) if self.groups_index and not self.shadowed else None
+        if changed is None:
+            self.groups_index, self.shadowed = self._index(scanner, self._scan(scanner, validate), validate)
+            self.validated = validate
+        else:
+            self.validated = self.validated and validate
+
+        if started is not None:
+            self.metrics.add("index.scan.seconds", time.perf_counter() - started)
+
+        if self.negative is not None:
+            self.negative.purge()
+
+        self.scanner = scanner
+        self.preamble_hash = self._compute_preamble_hash(scanner)
+        self.source_chunks = chunks
+
+        self.source_signature = signature
+        self.source_sample = sample
+        self.source_cache_key = source_key
+
+        if self.sidecar is not None:
+            self._dump(scanner, changed is None)
+
+        if self.shared is not None:
+            self._publish(scanner, changed is None)
+
+        return changed
+
+    def validate(self):
+        """
+        Validate a snapshot of the source, without changing the index.
+        Raise a validation error if we find invalid configurations.
+
+        :return: None
+        """
+
+        scanner = Scanner(self.reader.snapshot(), self.overrides, digest=self.digest)
+        self._index(scanner, self._scan(scanner, True), True)
+
+    def _matches(self, state, scanner: Scanner, signature: Optional[Tuple[int, int, int]], validate: bool) -> bool:
+        """
+        Check if an index saved by another build (in the sidecar or in a shared index) was built for the current
+        version of the source.
+
+        The source's signature is enough to match them, if both can be trusted. Otherwise, the source is hashed, which
+        is still cheaper than scanning it.
+
+        :param state: Saved index's source signature, source key, digest and whether it was validated.
+        :param scanner: Scanner over a snapshot of the source.
+        :param signature: Source's current signature.
+        :param validate: match only indexes of validated sources.
+        :return: bool
+        """
 
-        self.groups_index = {}
+        if validate and not state.validated:
+            return False
 
-        for group in self.scanner.groups(validate):
-            if validate and group.name in self.groups_index:
-                raise ValidationError(f"Duplicate group name: {group.name}")
+        # digests computed with another hash can't be compared
+        if state.digest != self.digest:
+            return False
+
+        if signature is not None and signature == state.signature:
+            return True
+
+        # indexes saved with a trusted signature don't have a source key
+        if not state.source_key:
+            return False
+
+        return self._compute_source_key(scanner.reader) == state.source_key
+
+    def _adopt(self, state, scanner: Scanner, signature: Optional[Tuple[int, int, int]], groups_index: Mapping):
+        """
+        Use an index saved by another build, matching the current version of the source.
+
+        :param state: Saved index's source key, preamble hash and how it was built.
+        :param scanner: Scanner over a snapshot of the source.
+        :param signature: Source's current signature.
+        :param groups_index: Saved groups.
+        :return: None
+        """
+
+        if self.negative is not None:
+            self.negative.purge()
+
+        self.groups_index = groups_index
+        self.shadowed = state.shadowed
+        self.validated = state.validated
+
+        self.scanner = scanner
+        self.preamble_hash = state.preamble_hash
+        self.source_chunks = self._compute_source_chunks(scanner.reader)
+
+        self.source_signature = signature
+        self.source_sample = self._compute_source_sample(scanner.reader)
+        self.source_cache_key = state.source_key or None
+
+    def _load(self, scanner: Scanner, signature: Optional[Tuple[int, int, int]], validate: bool = False) -> bool:
+        """
+        Load the index saved in the sidecar, if it was saved for the current version of the source.
+
+        :param scanner: Scanner over a snapshot of the source.
+        :param signature: Source's current signature.
+        :param validate: load only indexes of validated sources.
+        :return: whether the index was loaded
+        """
+
+        state = self.sidecar.load()
+        if state is None or not self._matches(state, scanner, signature, validate):
+            return False
+
+        groups_index, _ = self._index(scanner, self._restore(scanner, state.groups))
+        self._adopt(state, scanner, signature, groups_index)
+
+        return True
+
+    def _attach(self, scanner: Scanner, signature: Optional[Tuple[int, int, int]], validate: bool = False) -> bool:
+        """
+        Attach to the shared index's current generation, if it was built for the current version of the source.
+
+        :param scanner: Scanner over a snapshot of the source.
+        :param signature: Source's current signature.
+        :param validate: attach only to indexes of validated sources.
+        :return: whether the index was attached
+        """
+
+        attached = self.shared.attach(scanner)
+        if attached is None or not self._matches(attached[0], scanner, signature, validate):
+            return False
+
+        generation, groups_index = attached
+        self._adopt(generation, scanner, signature, groups_index)
+
+        logging.debug(f"Attached to the shared index of {self.source} in {self.shared.path}.")
+        return True
+
+    def _publish(self, scanner: Scanner, scanned: bool = True):
+        """
+        Publish the current index as the shared index's new generation and attach to it, so this process shares its
+        memory with the others as well.
+
+        :param scanner: Scanner over the indexed snapshot of the source.
+        :param scanned: The entire source was scanned, not only the regions that changed.
+        :return: None
+        """
+
+        generation = Generation(
+            self.source_signature,
+            self._saved_key(scanner, scanned),
+            self.validated,
+            self.shadowed,
+            self.preamble_hash,
+            self.digest,
+        )
+        self.shared.publish(generation, self.groups_index)
+
+        attached = self.shared.attach(scanner)
+        if attached is not None and attached[0] == generation:
+            self.groups_index = attached[1]
+
+    def _dump(self, scanner: Scanner, scanned: bool = True):
+        """
+        Save the current index in the sidecar.
+
+        :param scanner: Scanner over the indexed snapshot of the source.
+        :param scanned: The entire source was scanned, not only the regions that changed.
+        :return: None
+        """
+
+        self.sidecar.dump(
+            self.source_signature,
+            self._saved_key(scanner, scanned),
+            self.validated,
+            self.shadowed,
+            self.preamble_hash,
+            self.groups_index,
+            self.digest,
+        )
+
+    def _saved_key(self, scanner: Scanner, scanned: bool) -> str:
+        """
+        Source key saved with the index, so other builds can match it even if only the source's metadata changed.
+
+        Hashing the entire source after every change would undo incremental re-indexes, so it's computed only if the
+        entire source was scanned anyway or if its signature can't be trusted. Otherwise, the key is saved only if
+        it's already known and the index can be matched only by its signature.
+
+        :param scanner: Scanner over the indexed snapshot of the source.
+        :param scanned: The entire source was scanned.
+        :return: Source's content hash or an empty string.
+        """
+
+        if self.source_cache_key is None and (scanned or self.source_signature is None):
+            self.source_cache_key = self._compute_source_key(scanner.reader)
+
+        return self.source_cache_key or ""
+
+    def _restore(self, scanner: Scanner, groups: Iterable[Tuple[str, int, int, int, bytes]]) -> Iterable[Group]:
+        """
+        Re-create groups found by another process.
+
+        :param scanner: Scanner over the snapshot the groups were found in.
+        :param groups: (name, header, start, end, digest) of each group
+        :return: yields groups
+        """
+
+        for name, header, start, end, digest in groups:
+            group = Group(scanner, name, start, scanner.overrides, header)
+            group.ends(end, digest)
+
+            yield group
+
+    def _scan(self, scanner: Scanner, validate: bool = False, start: int = 0, end: int = None) -> Iterable[Group]:
+        """
+        Scan the groups within an interval. Large intervals are split at group headers and scanned in parallel, by a
+        pool of processes, each one reading its own region.
+
+        :param scanner: Scanner over a snapshot of the source.
+        :param validate: raise validation errors if we find invalid configurations.
+        :param start: start byte, the start of a group's header or of the file
+        :param end: end byte, the start of a group's header or the end of file
+        :return: groups, in the order they are found in the file
+        """
+
+        if end is None:
+            end = scanner.reader.stat().st_size
+
+        chunks = min(self.workers, (end - start) // MIN_CHUNK_SIZE)
+        if chunks < 2:
+            return scanner.groups(validate, start, end)
+
+        boundaries = {scanner.boundary(start + (end - start) * chunk // chunks, end) for chunk in range(1, chunks)}
+        boundaries = [start] + sorted(boundaries - {start, end}) + [end]
+
+        logging.debug(f"Scanning {self.source} in {len(boundaries) - 1} regions.")
+
+        # workers open the file on their own, so make sure it's still the snapshot we're indexing
+        identity = self._compute_source_identity(scanner.reader.stat())
+        with ProcessPoolExecutor(len(boundaries) - 1) as pool:
+            regions = list(
+                pool.map(
+                    _scan, repeat(self.source), boundaries[:-1], boundaries[1:], repeat(validate), repeat(self.digest)
+                )
+            )
+
+        if self._compute_source_identity(self.reader.stat()) != identity:
+            logging.debug(f"{self.source} was replaced while scanning it, scanning it again.")
+            return scanner.groups(validate, start, end)
+
+        return [group for region in regions for group in self._restore(scanner, region)]
+
+    def _index(self, scanner: Scanner, groups: Iterable[Group], validate: bool = False) -> Tuple[Mapping, bool]:
+        """
+        Build a new index from the given groups, stored by the configured engine.
+
+        :param scanner: Scanner over the snapshot the groups were found in.
+        :param groups: groups, in the order they are found in the file.
+        :param validate: raise validation errors if we find duplicate groups.
+        :return: new index and whether some groups are hidden by duplicates
+        """
+
+        return ENGINES[self.engine].build(scanner, groups, validate)
+
+    def _reindex(
+        self, scanner: Scanner, chunks: Tuple[int, List[bytes], List[bytes]], validate: bool = False
+    ) -> Optional[Set[str]]:
+        """
+        Re-scan only the region of the file that changed since the last build.
+
+        Chunks that are the same from the start of the file are still in place, and chunks that are the same from its
+        end moved by the difference in size. Groups are contiguous: each one ends where the next one's header starts
+        and the last one ends with the file. Groups up to the last header in the same chunks at the start are kept, and
+        groups from the first header in the same chunks at the end are kept and moved. Only what's left in between is
+        scanned again, and spliced in the index, so the cost depends on the size of the change, not of the file.
+
+        :param scanner: Scanner over the new snapshot of the file.
+        :param chunks: Size and chunks' hashes of the new snapshot.
+        :param validate: raise validation errors if we find invalid configurations.
+        :return: names of the groups whose content changed, None if the region can't be re-indexed on its own.
+        """
+
+        if self.source_chunks is None:
+            return None
+
+        if chunks == self.source_chunks:
+            return set()
+
+        size, heads, tails = chunks
+        previous_size, previous_heads, previous_tails = self.source_chunks
+
+        # bytes that are the same at the start and at the end of the file, without overlapping
+        before = min(_common(heads, previous_heads) * CHANGE_CHUNK_SIZE, size, previous_size)
+        after = min(_common(tails, previous_tails) * CHANGE_CHUNK_SIZE, min(size, previous_size) - before)
+        shift = size - previous_size
+
+        groups = self.groups_index.ordered()
+
+        # groups before the last header line that's the same are kept, if the preamble is the same too
+        head = _count(groups, lambda group: group.start, before + 1) - 1
+        start = groups[head].header if head >= 0 else 0
+        head = max(head, 0)
+
+        # groups after the first header that's the same, starting a line that's the same too, are kept and moved
+        tail = _count(groups, lambda group: group.header, previous_size - after + 1)
+        end = groups[tail].header if tail < len(groups) else previous_size
+
+        logging.debug(f"Re-indexing {self.source} between {start} and {end + shift}.")
+
+        scanned = list(self._scan(scanner, validate, start, end + shift))
+        region, shadowed = GroupDict.build(scanner, scanned, validate)
+
+        replaced = {groups[position].name: groups[position]._hash for position in range(head, tail)}
+
+        # duplicates of groups outside the region hide each other, in the entire file
+        if shadowed or any(name not in replaced and name in self.groups_index for name in region):
+            return None
+
+        groups_index = GroupSplice(scanner, self.groups_index, head, tail, start, end, shift, region)
+
+        # shared indexes are published with all their groups anyway
+        if head == 0 and tail == len(groups) or groups_index.depth > MAX_SPLICES or self.shared is not None:
+            groups_index, _ = self._index(scanner, groups_index.values())
+
+        self.groups_index = groups_index
+
+        # groups that only moved keep their content
+        return {
+            name
+            for name in replaced.keys() | region.keys()
+            if name not in replaced or name not in region or replaced[name] != region[name]._hash
+        }
+
+    def is_fresh(self, group: Group) -> bool:
+        """
+        Check if a group is still the same in the current version of the source, without re-indexing it.
+        If the source's signature didn't change, nothing did. Otherwise, only the group's byte range is read, through
+        the indexed snapshot, unless the source was replaced.
+
+        :param group: Indexed group.
+        :return: bool
+        """
+
+        # Builds swap the index before the signature, so an index read after the signature is at least as recent. The
+        # group may have been taken from a previous index, so the signature is enough only if the group is indexed.
+        stat = self.reader.stat()
+        signature = self._compute_source_signature(stat)
+        if signature is not None and signature == self.source_signature and self._is_indexed(group):
+            return True
+
+        # The indexed snapshot reads the file as it's modified in place, so checks don't open the file every time. If
+        # it was replaced, it needs to be re-indexed anyway.
+        scanner = self.scanner
+        if not scanner.reader.reads(stat):
+            return False
+
+        return group.is_fresh(scanner)
+
+    def is_current(self) -> bool:
+        """
+        Check if the index was built for the current version of the source, from its metadata only. Sources modified
+        too recently can't be trusted to be the same.
+
+        :return: bool
+        """
+
+        signature = self._compute_source_signature(self.reader.stat())
+        return signature is not None and signature == self.source_signature
+
+    def _is_indexed(self, group: Group) -> bool:
+        """
+        Check if the group is in the current index. Compact engines create groups on access, so the indexed one may be
+        a different object, at the same position and with the same content.
+
+        :param group: Group, possibly from a previous index.
+        :return: bool
+        """
 
-            self.groups_index[group.name] = group
+        current = self.groups_index.get(group.name)
+        if current is None or current is group:
+            return current is group
 
-        self.source_cache_key = self._compute_source_key()
+        return (current.header, current.end, current._hash) == (group.header, group.end, group._hash)
 
     def get(self, group_name: str) -> Optional[Group]:
         """
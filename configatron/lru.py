@@ -1,14 +1,24 @@
+import threading
 import time
 from collections import OrderedDict
-from typing import Optional
+from typing import Callable, Dict, Hashable, Iterable, Optional
+
+from configatron.metrics import Metrics
 
 
 class LRUCache:
-    def __init__(self, capacity: int, lifetime: int):
+    def __init__(self, capacity: int, lifetime: int, metrics: Metrics = None, name: str = "cache"):
         self.cache = OrderedDict()
         self.capacity = capacity
         self.lifetime = lifetime
 
+        # hits, misses, expirations and evictions are counted as <name>.hits, ...
+        self.metrics = metrics
+        self.name = name
+
+        # even reads re-order the cache, so every operation holds the lock
+        self.lock = threading.Lock()
+
     def get(self, key: str) -> Optional[object]:
         """
         Return an object from cache, based on a cache key.
@@ -18,16 +28,29 @@ class LRUCache:
         :return: object or None
         """
 
-        if key not in self.cache:
-            return None
+        with self.lock:
+            if key not in self.cache:
+                if self.metrics is not None:
+                    self.metrics.add(f"{self.name}.misses")
 
-        item, added = self.cache[key]
-        if time.time() - added < self.lifetime:
-            self.cache.move_to_end(key)
-            return item
+                return None
+
+            item, added = self.cache[key]
+            if time.time() - added < self.lifetime:
+                self.cache.move_to_end(key)
+
+                if self.metrics is not None:
+                    self.metrics.add(f"{self.name}.hits")
+
+                return item
 
-        del self.cache[key]
-        return None
+            del self.cache[key]
+
+            if self.metrics is not None:
+                self.metrics.add(f"{self.name}.misses")
+                self.metrics.add(f"{self.name}.expirations")
+
+            return None
 
     def put(self, key: str, value: object):
         """
@@ -38,11 +61,50 @@ class LRUCache:
         :return: None
         """
 
-        self.cache[key] = (value, time.time())
-        self.cache.move_to_end(key)
+        with self.lock:
+            self.cache[key] = (value, time.time())
+            self.cache.move_to_end(key)
+
+            if len(self.cache) > self.capacity:
+                self.cache.popitem(last=False)
+
+                if self.metrics is not None:
+                    self.metrics.add(f"{self.name}.evictions")
 
-        if len(self.cache) > self.capacity:
-            self.cache.popitem(last=False)
+    def invalidate(self, keys: Iterable[str]):
+        """
+        Remove only some items from cache.
+
+        :param keys: cache keys to remove
+        :return: None
+        """
+
+        with self.lock:
+            for key in keys:
+                self.cache.pop(key, None)
+
+    def refresh(self, update: Callable[[Hashable, object], Optional[object]], keys: Iterable[Hashable] = None):
+        """
+        Replace items with their updated version, keeping their age and position, or remove them if they can't be
+        updated.
+
+        :param update: called with each key and item, returns the updated item or None
+        :param keys: cache keys to update, all of them by default
+        :return: None
+        """
+
+        with self.lock:
+            for key in list(self.cache) if keys is None else keys:
+                if key not in self.cache:
+                    continue
+
+                item, added = self.cache[key]
+                updated = update(key, item)
+
+                if updated is None:
+                    del self.cache[key]
+                else:
+                    self.cache[key] = (updated, added)
 
     def purge(self):
         """
@@ -50,4 +112,92 @@ class LRUCache:
         :return: None
         """
 
-        self.cache = OrderedDict()
+        with self.lock:
+            self.cache = OrderedDict()
+
+
+class ShardedLRUCache:
+    """
+    Split the cache in multiple LRU caches, each one with its own lock, so threads accessing different keys don't wait
+    for each other. Capacity is split evenly between shards, so eviction is only approximately least recently used.
+    """
+
+    def __init__(self, capacity: int, lifetime: int, shards: int = 16, metrics: Metrics = None, name: str = "cache"):
+        self.shards = [LRUCache(max(capacity // shards, 1), lifetime, metrics, name) for _ in range(shards)]
+
+    def shard(self, key: Hashable) -> LRUCache:
+        return self.shards[hash(key) % len(self.shards)]
+
+    def get(self, key: Hashable) -> Optional[object]:
+        return self.shard(key).get(key)
+
+    def put(self, key: Hashable, value: object):
+        self.shard(key).put(key, value)
+
+    def invalidate(self, keys: Iterable[Hashable]):
+        for key in keys:
+            self.shard(key).invalidate((key,))
+
+    def refresh(self, update: Callable[[Hashable, object], Optional[object]], keys: Iterable[Hashable] = None):
+        if keys is None:
+            for shard in self.shards:
+                shard.refresh(update)
+            return
+
+        for key in keys:
+            self.shard(key).refresh(update, (key,))
+
+    def purge(self):
+        for shard in self.shards:
+            shard.purge()
+
+
+class NegativeCache(LRUCache):
+    """
+    Remember keys known to be missing, so looking them up again doesn't hit the disk or trigger a re-index.
+    It needs to be purged when the index changes, since missing keys could have been added in the meantime.
+    """
+
+    def __init__(self, capacity: int, lifetime: int, metrics: Metrics = None):
+        super().__init__(capacity, lifetime, metrics, "negative")
+
+        self.hits = 0
+        self.misses = 0
+
+    def contains(self, key: Hashable) -> bool:
+        """
+        Check if the key is known to be missing.
+
+        :param key: uniq cache key.
+        :return: bool
+        """
+
+        missing = self.get(key) is not None
+
+        # counted under the lock, since threads look up missing keys concurrently
+        with self.lock:
+            if missing:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        return missing
+
+    def add(self, key: Hashable):
+        """
+        Mark the key as missing.
+
+        :param key: uniq cache key.
+        :return: None
+        """
+
+        self.put(key, True)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the number of hits, misses and the number of keys currently known to be missing.
+
+        :return: stats
+        """
+
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.cache)}
@@ -0,0 +1,44 @@
+import threading
+from typing import Callable, Dict
+
+
+class Metrics:
+    """
+    Counters and timers (in seconds) of the hot paths: caches, index builds, reads, hashing, scans and group indexing.
+
+    Components hold an optional `Metrics` and skip instrumentation when it's None, so disabled metrics cost a single
+    check. The hook, if any, is called with the metric's name and increment every time a metric is updated, from the
+    thread updating it, so it needs to be fast and must not use the config.
+    """
+
+    def __init__(self, hook: Callable[[str, float], None] = None):
+        self.values = {}
+        self.hook = hook
+
+        # counters are updated from every thread reading the config
+        self.lock = threading.Lock()
+
+    def add(self, name: str, value: float = 1):
+        """
+        Increment a counter or add to a timer.
+
+        :param name: metric's name
+        :param value: increment, seconds for timers
+        :return: None
+        """
+
+        with self.lock:
+            self.values[name] = self.values.get(name, 0) + value
+
+        if self.hook is not None:
+            self.hook(name, value)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Snapshot of all the metrics updated so far.
+
+        :return: metrics, by name
+        """
+
+        with self.lock:
+            return dict(self.values)
@@ -1,4 +1,7 @@
 class Node:
+    # Nodes are created for every group and property in the file, so they don't carry a __dict__.
+    __slots__ = ()
+
     @classmethod
     def is_valid(cls, line: str) -> bool:
         return cls.REGEX.match(line) is not None
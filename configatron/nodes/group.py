@@ -1,10 +1,24 @@
 import re
-from typing import List
+import time
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Tuple, Union
 
 from .base import Node
+from .property import Candidates, Property, Raw
 from ..utils import EmptyConfig
 
 
+# Groups share the same read-only properties until they are indexed.
+NO_PROPERTIES = MappingProxyType({})
+
+# Marks missing properties, since any value can be stored.
+MISSING = object()
+
+# Bytes read after a group, to check the next line. Longer lines are streamed.
+PEEK_SIZE = 256
+
+
 class Group(Node):
     """
     starts with
@@ -18,84 +32,262 @@ class Group(Node):
 
     REGEX = re.compile("^\s*\[(?P<name>[a-zA-Z0-9]+)\]\s*(;.*)?$")
 
-    def __init__(self, scanner, name: str, start: int, overrides: List[str] = None):
+    # Same expression, used to match raw lines, without decoding them.
+    BINARY_REGEX = re.compile(REGEX.pattern.encode())
+
+    # Every header contains a match, so blocks of lines can be searched for it and only matching lines are checked.
+    HEADER_HINT = re.compile(rb"\[[a-zA-Z0-9]+\]")
+
+    __slots__ = ("name", "scanner", "properties", "overrides", "header", "start", "end", "_hash")
+
+    def __init__(self, scanner, name: str, start: int, overrides: Tuple[str, ...] = None, header: int = None):
         self.name = name
         self.scanner = scanner
-        self.properties = {}
+        self.properties = NO_PROPERTIES
 
-        self.overrides = overrides or []
+        # shared by all the groups of a scanner
+        self.overrides = overrides or ()
 
+        # position of the group's header line, its content starts right after it
+        self.header = header
         self.start = start
         self.end = None
-        self._hash = ""
+        self._hash = b""
 
     @classmethod
-    def parse(cls, scanner: "Scanner", line: str, start: int, overrides: List[str] = None) -> "Group":
+    def regex(cls, line: Union[str, bytes]) -> "re.Pattern":
+        return cls.BINARY_REGEX if isinstance(line, bytes) else cls.REGEX
+
+    @classmethod
+    def is_valid(cls, line: Union[str, bytes]) -> bool:
+        return cls.regex(line).match(line) is not None
+
+    @classmethod
+    def parse(
+        cls, scanner: "Scanner", line: Union[str, bytes], start: int, overrides: Tuple[str, ...] = None
+    ) -> "Group":
         """
         Exctract helpful data from current line.
 
         :param scanner: Scanner instance. Used to re-index properties and check if the current group is 1:1 with it's origin.
         :param line: Current line being parsed.
-        :param start: Absolute position in the file.
-        :param overrides: List of accepted overrides.
+        :param start: Absolute position in the file, where the group's content starts (right after the current line).
+        :param overrides: Accepted overrides.
         :return: group
         """
 
-        match = cls.REGEX.match(line)
-        return cls(scanner, match.group("name"), start, overrides)
+        match = cls.regex(line).match(line)
+
+        name = match.group("name")
+        if isinstance(name, bytes):
+            name = name.decode()
 
-    @property
-    def is_fresh(self) -> bool:
+        return cls(scanner, name, start, overrides, start - len(line))
+
+    def is_fresh(self, scanner: "Scanner") -> bool:
         """
-        Compare current content with file's group content.
+        Check if the group is still the same in the file's current version: same header and content, at the same
+        position, followed by the next group's header or by the end of the file.
+        Only the group's byte range and the line after it are read.
 
+        :param scanner: Scanner over the file's current version.
         :return: bool
         """
 
-        return self._hash == self.scanner.compute_hash(self.start, self.end)
+        if not self.is_intact(scanner):
+            return False
+
+        # otherwise, the group may have grown
+        following = scanner.reader.block(self.end, self.end + PEEK_SIZE)
+        newline = following.find(b"\n")
+        if newline != -1:
+            following = following[: newline + 1]
+        elif len(following) == PEEK_SIZE:
+            following = next(scanner.reader.lines(self.end))[2]
+
+        return not following or self.BINARY_REGEX.match(following) is not None
 
-    def ends(self, end: int):
+    def is_intact(self, scanner: "Scanner", shift: int = 0, content: bool = True) -> bool:
         """
-        Mark the end of the group. Compute it's current hash.
+        Check if the group, header included, can still be found in the file, moved by `shift` bytes.
+        Only the group's byte range is read.
+
+        :param scanner: Scanner over the file's current version.
+        :param shift: Number of bytes the group was moved with.
+        :param content: Check the group's content as well, not only its header.
+        :return: bool
+        """
+
+        header = self.header + shift
+        if header < 0:
+            return False
+
+        # read the byte before the header as well, to make sure the header still starts on a new line
+        end = self.end if content else self.start
+        block = scanner.reader.block(max(header - 1, 0), end + shift)
+        if header > 0:
+            if block[:1] != b"\n":
+                return False
+
+            block = block[1:]
+
+        if len(block) != end - self.header:
+            return False
+
+        line, body = block[: self.start - self.header], block[self.start - self.header :]
+        if not line.endswith(b"\n"):
+            return False
+
+        match = self.BINARY_REGEX.match(line)
+        if match is None or match.group("name").decode() != self.name:
+            return False
+
+        if not content:
+            return True
+
+        started = time.perf_counter() if scanner.metrics is not None else None
+        _hash = scanner.new_hash()
+        _hash.update(body)
+
+        if started is not None:
+            scanner.metrics.add("hash.seconds", time.perf_counter() - started)
+
+        return _hash.digest() == self._hash
+
+    def moved(self, scanner: "Scanner", shift: int) -> "Group":
+        """
+        Copy of the group, found in a newer version of the file, moved by `shift` bytes.
+        Groups are not changed once indexed, since they can be read from other threads. The copy shares the already
+        indexed properties.
+
+        :param scanner: Scanner over the file's current version.
+        :param shift: Number of bytes the group was moved with.
+        :return: group
+        """
+
+        # built directly, since copying slotted objects with `copy.copy` is several times slower, and every kept group is
+        # copied on each re-index
+        group = type(self)(scanner, self.name, self.start + shift, self.overrides, self.header + shift)
+        group.end = self.end + shift
+        group._hash = self._hash
+        group.properties = self.properties
+
+        return group
+
+    def inherit(self, previous: "Group") -> bool:
+        """
+        Take over the indexed properties of a previous version of the group, if its content didn't change.
+
+        :param previous: Same group, found in a previous version of the file.
+        :return: whether the content is the same
+        """
+
+        if previous.name != self.name or previous._hash != self._hash:
+            return False
+
+        if self.properties is NO_PROPERTIES:
+            self.properties = previous.properties
+
+        return True
+
+    def ends(self, end: int, digest: bytes = None):
+        """
+        Mark the end of the group. Compute it's current digest, unless the scanner already hashed the content while
+        reading it.
 
         :param end: Position of the last byte in file.
+        :param digest: Digest of the group's content, fed line by line by the scanner or loaded from a saved index.
         :return: None
         """
 
         self.end = end
-        self._hash = self.scanner.compute_hash(self.start, self.end)
+
+        if digest is None:
+            digest = self.scanner.compute_hash(self.start, self.end).digest()
+
+        self._hash = digest
 
     def index(self):
         """
         Scan over the current group and add it's properties in memory.
-        Store overrides as well.
+        Resolve overrides as well: each property keeps only the value of its active override with the highest priority
+        or, if it has none, its default value. Values are kept raw and decoded on their first lookup, so properties with
+        multiple values keep all of them, by priority, and fall back to the next one if a value isn't valid.
 
         :return: None
         """
 
+        metrics = self.scanner.metrics
+        started = time.perf_counter() if metrics is not None else None
+
+        # overrides are sorted by priority, the default value comes last
+        ranks = {override: rank for rank, override in enumerate(self.overrides)}
+        default = len(self.overrides)
+
+        # most properties have a single value, so a list is created only for the others
+        resolved = {}
         for property in self.scanner.fill_group(self.start, self.end):
-            if property.override:
-                self.properties[f"{property.name}-{property.override}"] = property.value
+            rank = ranks.get(property.override, -1) if property.override else default
+            if rank < 0:
+                continue
+
+            current = resolved.get(property.name)
+            if current is None:
+                resolved[property.name] = (rank, property.value)
+            elif type(current) is list:
+                current.append((rank, property.value))
             else:
-                self.properties[property.name] = property.value
+                resolved[property.name] = [current, (rank, property.value)]
+
+        # build a new map and swap it, so readers from other threads never see a partially indexed group
+        properties = {}
+        for name, values in resolved.items():
+            if type(values) is tuple:
+                properties[name] = values[1]
+                continue
+
+            # the last value wins, for the same override, and the sort is stable
+            values.reverse()
+            values.sort(key=itemgetter(0))
+            properties[name] = Candidates(value for _, value in values)
+
+        self.properties = properties
+
+        if started is not None:
+            metrics.add("groups.indexed")
+            metrics.add("groups.index.seconds", time.perf_counter() - started)
 
     def get(self, name: str, indexed: bool = False):
         """
-        Return property from local cache. If missing, re-index the group. Take into account overrides.
+        Return property from local cache. If missing, re-index the group. Overrides are already resolved.
+        Raw values are decoded once and the decoded value replaces them.
 
         :param name: Property name.
         :param indexed: Mark if was recently indexed. If not and the property is missing, re-index.
         :return: Property's value.
         """
 
-        # compute property's keys, taking into account the overrides.
-        keys = [f"{name}-{override}" for override in self.overrides] + [name]
-        for key in keys:
-            if key in self.properties:
-                return self.properties.get(key)
+        value = self.properties.get(name, MISSING)
+        if type(value) is Raw:
+            # replacing a value doesn't resize the map, so readers from other threads can still use it
+            value = self.properties[name] = Property.decode(value)
+        elif type(value) is Candidates:
+            value = self.properties[name] = value.decode()
+
+        if value is not MISSING:
+            # values that can't be decoded are ignored, like invalid lines
+            return EmptyConfig() if value is None else value
 
         # if the property is still missing, after re-index, don't fail, but return EmptyConfig
+        negative = self.scanner.negative
         if indexed:
+            if negative is not None:
+                negative.add((self.name, name))
+
+            return EmptyConfig()
+
+        # property was recently looked up and it was missing
+        if negative is not None and negative.contains((self.name, name)):
             return EmptyConfig()
 
         # search for missing property
@@ -82,6 +82,89 @@ def array(value: str) -> Optional[List[any]]:
 
 properties = [array, boolean, number, path, string]
 
+BOOLEANS = {"yes": True, "true": True, "1": True, "no": False, "false": False, "0": False}
+
+
+def coerce(value: str):
+    """
+    Decode a value in a single pass, with the same rules as trying every kind of `properties`, in order.
+    The kind is picked from the value's first and last characters.
+
+    Unlike `number`, malformed numbers, like 1.2.3 or --1, are not valid.
+
+    :param value: Raw value.
+    :return: Decoded value or None, if it's not valid.
+    """
+
+    if not value:
+        return None
+
+    first, last = value[0], value[-1]
+
+    # quoted values are never arrays
+    if first == '"' or last == '"':
+        if first == last == '"':
+            inner = value[1:-1]
+            if '"' not in inner or '\\"' in inner:
+                return inner
+
+        return os.path.normpath(value) if first == "/" else None
+
+    if "," in value:
+        return value.split(",")
+
+    # paths are already absolute, so there's no need for `abspath`
+    if first == "/":
+        return os.path.normpath(value)
+
+    decoded = BOOLEANS.get(value)
+    if decoded is not None:
+        return decoded
+
+    digits = value[1:] if first == "-" else value
+    if not digits.isascii():
+        return None
+
+    if digits.isdigit():
+        return int(value)
+
+    # at most one dot, with digits on at least one side
+    whole, dot, fraction = digits.partition(".")
+    if dot and (whole or fraction) and (not whole or whole.isdigit()) and (not fraction or fraction.isdigit()):
+        return float(value)
+
+    return None
+
+
+class Raw(str):
+    """
+    Property value, as found in the file, which wasn't decoded yet.
+    """
+
+    __slots__ = ()
+
+
+class Candidates(tuple):
+    """
+    Raw values of a property with multiple values, from the highest priority to the lowest, which weren't decoded yet.
+    """
+
+    __slots__ = ()
+
+    def decode(self):
+        """
+        Decode the first value that is valid. Invalid values are ignored, like invalid lines.
+
+        :return: Decoded value or None, if none of them is valid.
+        """
+
+        for value in self:
+            value = coerce(value)
+            if value is not None:
+                return value
+
+        return None
+
 
 class Property(Node):
     """
@@ -104,6 +187,8 @@ class Property(Node):
         '^\s*(?P<name>[a-zA-Z_-]+)(<(?P<override>[a-zA-Z_-]+)>)?\s*=\s*(?P<value>[a-zA-Z0-9-/,\."]+)\s*(;.*)?$'
     )
 
+    __slots__ = ("name", "value", "override")
+
     def __init__(self, name: str, value: str, override: str = None):
         self.name = name
         self.value = value
@@ -122,10 +207,35 @@ class Property(Node):
         if not match:
             return
 
-        for kind in properties:
-            value = kind(match.group("value"))
-            if value is not None:
-                return cls(match.group("name"), value, match.group("override"))
+        value = cls.decode(match.group("value"))
+        if value is not None:
+            return cls(match.group("name"), value, match.group("override"))
+
+    @classmethod
+    def lazy(cls, line: str) -> Optional["Property"]:
+        """
+        Parse the current line, keeping the raw value. Values are decoded with `decode`, once they're needed.
+
+        :param line: Current line being processed.
+        :return: Property, holding a `Raw` value, or None
+        """
+
+        match = cls.REGEX.match(line)
+        if not match:
+            return
+
+        return cls(match.group("name"), Raw(match.group("value")), match.group("override"))
+
+    @staticmethod
+    def decode(value: str):
+        """
+        Extract the true value from a raw one.
+
+        :param value: Raw value.
+        :return: Decoded value or None, if it's not valid.
+        """
+
+        return coerce(value)
 
     @classmethod
     def is_valid(cls, line: str) -> bool:
@@ -140,11 +250,7 @@ class Property(Node):
         if match is None:
             return False
 
-        for kind in properties:
-            if kind(match.group("value")) is not None:
-                return True
-
-        return False
+        return cls.decode(match.group("value")) is not None
 
     def __repr__(self):
         return self.value
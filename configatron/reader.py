@@ -1,14 +1,123 @@
+import mmap
 import os
+import threading
+from typing import Union
+
+from configatron.metrics import Metrics
+
+
+# Number of bytes read from the file at once, while streaming lines.
+DEFAULT_BUFFER_SIZE = 64 * 1024
 
 
 class Reader:
-    def __init__(self, source: str):
+    def __init__(
+        self,
+        source: str,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        encoding: str = "utf-8",
+        descriptor: int = None,
+        metrics: Metrics = None,
+    ):
         if not os.path.exists(source):
             raise RuntimeError(f"Missing {source} file")
 
         self.source = source
+        self.buffer_size = buffer_size
+
+        # The file is read as raw bytes, so offsets are real byte offsets. Content is decoded only when needed.
+        self.encoding = encoding
+
+        # Snapshots read from an already opened file, so they keep seeing the same version of the config, even if it's
+        # replaced in the meantime.
+        self.descriptor = descriptor
+        self.lock = threading.Lock()
+
+        # Bytes read are counted as reader.bytes.
+        self.metrics = metrics
+
+    def __del__(self):
+        # the constructor fails before the descriptor is set, for missing files
+        if getattr(self, "descriptor", None) is not None:
+            os.close(self.descriptor)
+
+    def snapshot(self) -> "Reader":
+        """
+        Open the config and return a reader bound to it.
+
+        :return: reader
+        """
+
+        descriptor = os.open(self.source, os.O_RDONLY)
+        return Reader(self.source, self.buffer_size, self.encoding, descriptor, self.metrics)
+
+    def stat(self) -> os.stat_result:
+        """
+        Stat the config (or the opened file, for snapshots).
+
+        :return: stat result
+        """
+
+        if self.descriptor is None:
+            return os.stat(self.source)
+
+        return os.fstat(self.descriptor)
+
+    def reads(self, stat: os.stat_result) -> bool:
+        """
+        Check if the snapshot reads the current version of the config, which is the case while it's modified in place.
+        Readers that aren't snapshots always read the current version.
+
+        :param stat: Config's current stat result.
+        :return: bool
+        """
+
+        if self.descriptor is None:
+            return True
+
+        current = os.fstat(self.descriptor)
+        return (current.st_dev, current.st_ino) == (stat.st_dev, stat.st_ino)
+
+    def decode(self, data: bytes) -> str:
+        """
+        Decode a block or a line read from the file.
+
+        :param data: raw bytes
+        :return: decoded text
+        """
+
+        return data.decode(self.encoding)
 
-    def block(self, start: int, end: int = None) -> str:
+    def _read(self, start: int, size: int) -> bytes:
+        """
+        Read from the opened file, at a given position.
+
+        :param start: start byte
+        :param size: number of bytes
+        :return: read bytes
+        """
+
+        if not hasattr(os, "pread"):
+            with self.lock:
+                os.lseek(self.descriptor, start, os.SEEK_SET)
+                data = os.read(self.descriptor, size)
+        else:
+            data = os.pread(self.descriptor, size, start)
+
+            # reads can be shorter than requested, even before the end of file
+            while data and len(data) < size:
+                chunk = os.pread(self.descriptor, size - len(data), start + len(data))
+                if not chunk:
+                    break
+
+                data += chunk
+
+        if self.metrics is not None:
+            self.metrics.add("reader.bytes", len(data))
+
+        return data
+
+    def block(self, start: int, end: int = None) -> bytes:
         """
         Reads a block of data, within an interval.
 
@@ -17,26 +126,220 @@ class Reader:
         :return: read block of bytes.
         """
 
-        with open(self.source) as config:
+        if self.descriptor is not None:
+            if end is None:
+                end = self.stat().st_size
+
+            return self._read(start, max(end - start, 0))
+
+        with open(self.source, "rb") as config:
             config.seek(start)
+            data = config.read() if end is None else config.read(end - start)
 
-            if end is not None:
-                return config.read(end - start)
+        if self.metrics is not None:
+            self.metrics.add("reader.bytes", len(data))
 
-            return config.read()
+        return data
 
-    def lines(self, start: int = 0) -> str:
+    def chunks(self, start: int = 0) -> bytes:
+        """
+        Reads the file in chunks, of at most `buffer_size` bytes.
+
+        :param start: start byte
+        :return: yield chunks from the file
+        """
+
+        if self.descriptor is not None:
+            while chunk := self._read(start, self.buffer_size):
+                yield chunk
+                start += len(chunk)
+
+            return
+
+        with open(self.source, "rb") as config:
+            config.seek(start)
+
+            while chunk := config.read(self.buffer_size):
+                if self.metrics is not None:
+                    self.metrics.add("reader.bytes", len(chunk))
+
+                yield chunk
+
+    def lines(self, start: int = 0) -> bytes:
         """
         Reads line by line. Yield a line once is read. Keep the file open until all is read.
 
+        The file is streamed through a fixed size buffer, so memory usage doesn't depend on the file's size, only on
+        the buffer size and the longest line.
+
         :param start: start byte
         :return: yield lines from the file
         """
 
-        with open(self.source) as config:
-            config.seek(start)
+        # pieces of a line spanning multiple chunks, joined once it's complete, so long lines are copied only once
+        pending = []
+        for chunk in self.chunks(start):
+            position = 0
+
+            while (newline := chunk.find(b"\n", position)) != -1:
+                line = chunk[position : newline + 1]
+                if pending:
+                    pending.append(line)
+                    line = b"".join(pending)
+                    pending = []
 
-            for line in config.readlines():
                 end = start + len(line)
                 yield start, end, line
+
                 start = end
+                position = newline + 1
+
+            if position < len(chunk):
+                pending.append(chunk[position:])
+
+        # last line, without a trailing new line
+        if pending:
+            line = b"".join(pending)
+            yield start, start + len(line), line
+
+
+class MmapReader(Reader):
+    """
+    Map the config in memory once and serve blocks and lines as slices of the mapping, without opening, seeking and
+    reading the file for every call.
+
+    The mapping is shared with the file, so in-place updates are visible right away. If the file is replaced or its
+    size changes, it is mapped again before being read. Snapshots keep the mapping they were created with.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        encoding: str = "utf-8",
+        descriptor: int = None,
+        mapping: Union[mmap.mmap, bytes] = None,
+        metrics: Metrics = None,
+    ):
+        super().__init__(source, buffer_size, encoding, descriptor, metrics)
+
+        self._mapping = b"" if mapping is None else mapping
+        self._mapped = None
+
+    def snapshot(self) -> "MmapReader":
+        """
+        Open and map the config and return a reader bound to this mapping.
+
+        :return: reader
+        """
+
+        descriptor = os.open(self.source, os.O_RDONLY)
+        size = os.fstat(descriptor).st_size
+
+        # empty files can't be mapped
+        mapping = mmap.mmap(descriptor, 0, access=mmap.ACCESS_READ) if size else b""
+
+        return MmapReader(self.source, self.buffer_size, self.encoding, descriptor, mapping, self.metrics)
+
+    def reads(self, stat: os.stat_result) -> bool:
+        """
+        Check if the snapshot reads the current version of the config. Mappings don't cover what was appended after
+        they were created.
+
+        :param stat: Config's current stat result.
+        :return: bool
+        """
+
+        if self.descriptor is None:
+            return True
+
+        return super().reads(stat) and stat.st_size <= len(self._mapping)
+
+    def mapping(self) -> Union[mmap.mmap, bytes]:
+        """
+        Return the current mapping of the file. Map it again if it was replaced or resized since it was last mapped.
+
+        Old mappings are not closed explicitly, since they might still be in use by an ongoing scan. They are released
+        once nobody references them anymore.
+
+        :return: file's mapping
+        """
+
+        if self.descriptor is not None:
+            return self._mapping
+
+        stat = os.stat(self.source)
+        mapped = (stat.st_dev, stat.st_ino, stat.st_size)
+
+        if mapped != self._mapped:
+            if stat.st_size == 0:
+                # empty files can't be mapped
+                self._mapping = b""
+            else:
+                with open(self.source, "rb") as config:
+                    self._mapping = mmap.mmap(config.fileno(), 0, access=mmap.ACCESS_READ)
+
+            self._mapped = mapped
+
+        return self._mapping
+
+    def size(self, mapping: Union[mmap.mmap, bytes]) -> int:
+        """
+        Number of bytes that can be safely read from the mapping. Reading past the end of a file that was truncated in
+        place, after it was mapped, would crash the process.
+
+        :param mapping: current mapping
+        :return: size
+        """
+
+        if self.descriptor is None:
+            return len(mapping)
+
+        return min(len(mapping), os.fstat(self.descriptor).st_size)
+
+    def block(self, start: int, end: int = None) -> bytes:
+        """
+        Reads a block of data, within an interval.
+
+        :param start: start byte
+        :param end: end byte
+        :return: read block of bytes.
+        """
+
+        mapping = self.mapping()
+        size = self.size(mapping)
+        data = mapping[start : size if end is None else min(end, size)]
+
+        if self.metrics is not None:
+            self.metrics.add("reader.bytes", len(data))
+
+        return data
+
+    def lines(self, start: int = 0) -> bytes:
+        """
+        Reads line by line, straight from the mapping.
+
+        :param start: start byte
+        :return: yield lines from the file
+        """
+
+        mapping = self.mapping()
+        size = self.size(mapping)
+
+        # bytes read are counted once, even if the lines aren't all read
+        first = read = start
+        try:
+            while start < size:
+                end = read = mapping.find(b"\n", start, size) + 1 or size
+
+                yield start, end, mapping[start:end]
+                start = end
+        finally:
+            if self.metrics is not None:
+                self.metrics.add("reader.bytes", read - first)
+
+
+READERS = {
+    "file": Reader,
+    "mmap": MmapReader,
+}
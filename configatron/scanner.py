@@ -1,56 +1,230 @@
-import hashlib
+import time
 from typing import List
 
+from configatron.digests import DEFAULT_DIGEST, DIGESTS
 from configatron.errors import ValidationError
+from configatron.lru import NegativeCache
 from configatron.nodes.comment import Comment
 from configatron.nodes.group import Group
 from configatron.nodes.property import Property
 
 
 class Scanner:
-    def __init__(self, reader, overrides: List[str] = None):
+    def __init__(
+        self, reader, overrides: List[str] = None, negative: NegativeCache = None, digest: str = DEFAULT_DIGEST
+    ):
         self.reader = reader
-        self.overrides = overrides
 
-    def groups(self, validate: bool = True):
+        # Groups' content is hashed with the same digest as the rest of the index.
+        self.digest = digest
+        self.hasher = DIGESTS[digest]
+
+        # one tuple, shared by all the groups
+        self.overrides = tuple(overrides or ())
+
+        # Shared with the groups, to remember their missing properties.
+        self.negative = negative
+
+        # Shared with the groups, to count and time hashing and indexing.
+        self.metrics = reader.metrics
+
+    def groups(self, validate: bool = True, start: int = 0, end: int = None):
         """
-        Scan the reader and parse all the groups.
+        Scan the reader and parse all the groups, within an interval.
         Can throw exceptions if the scheme is not valid.
 
+        The file is read exactly once: its content is fed into a running hash of the group that is currently building,
+        and the hash is handed over to the group once we reach its end (next group or end of file).
+        Every line needs to be checked only when validating. Otherwise, headers are searched in large blocks.
+
         :param validate: Throws exceptions if the scheme is not valid
-        :return: None
+        :param start: start byte, needs to be the start of a line
+        :param end: end byte, needs to be the end of a line
+        :return: yields groups
         """
 
+        if validate:
+            return self._scan_lines(validate, start, end)
+
+        return self._scan_blocks(start, end)
+
+    def _scan_lines(self, validate: bool = True, start: int = 0, end: int = None):
+        """Scan the groups line by line, validating each line."""
+
         current_group = None
+        current_hash = None
+        last_end = start
+        stop = end
 
-        for start, end, line in self.reader.lines():
-            if Group.is_valid(line):
+        for start, end, line in self.reader.lines(start):
+            if stop is not None and start >= stop:
+                break
+
+            # Group headers are matched on raw bytes, lines are decoded only if they need to be validated.
+            if b"[" in line and Group.is_valid(line):
                 # Found a new group, so we can yield any currently building group
                 if current_group:
+                    current_group.ends(last_end, current_hash.digest())
                     yield current_group
 
                 current_group = Group.parse(self, line, start + len(line), self.overrides)
-            elif validate:
-                # check for valid properties
-                if "=" in line:
-                    if not Property.is_valid(line) or not current_group:
-                        raise ValidationError(f"Invalid property: {line}")
+                current_hash = self.new_hash()
+            else:
+                # blank lines are always valid
+                if validate and not line.isspace():
+                    text = self.reader.decode(line)
 
-                # check for valid comments and whitespaces
-                elif not Comment.is_valid(line):
-                    raise ValidationError(f"Invalid config: {line}")
+                    # check for valid properties
+                    if "=" in text:
+                        if not Property.is_valid(text) or not current_group:
+                            raise ValidationError(f"Invalid property: {text}")
 
-            if current_group:
-                current_group.ends(end)
+                    # check for valid comments and whitespaces
+                    elif not Comment.is_valid(text):
+                        raise ValidationError(f"Invalid config: {text}")
+
+                if current_group:
+                    current_hash.update(line)
+
+            last_end = end
 
         # Check for any groups that are currently building
         if current_group:
+            current_group.ends(last_end, current_hash.digest())
+            yield current_group
+
+    def _scan_blocks(self, start: int = 0, end: int = None):
+        """Scan the groups block by block, matching all the headers in a block at once."""
+
+        current_group = None
+        current_hash = None
+
+        for offset, block in self._blocks(start, end):
+            for group, content in self._find_groups(block, offset):
+                if current_group:
+                    current_hash.update(content)
+                    current_group.ends(group.header, current_hash.digest())
+                    yield current_group
+
+                current_group = group
+                current_hash = self.new_hash()
+
+            if current_group:
+                current_hash.update(block[max(current_group.start - offset, 0) :])
+
+            start = offset + len(block)
+
+        if current_group:
+            current_group.ends(start, current_hash.digest())
             yield current_group
 
+    def _blocks(self, start: int = 0, end: int = None):
+        """
+        Read the file in blocks of complete lines, within an interval.
+
+        :param start: start byte, needs to be the start of a line
+        :param end: end byte, needs to be the end of a line
+        :return: yields each block and its position in the file
+        """
+
+        # pieces of the last line, carried to the next block unless it's complete, so long lines are copied only once
+        pending, pending_size = [], 0
+        for chunk in self.reader.chunks(start):
+            if end is not None:
+                chunk = chunk[: end - start - pending_size]
+
+            # only the new chunk needs to be searched, the pending pieces have no new line
+            complete = chunk.rfind(b"\n") + 1
+            if complete:
+                block = b"".join(pending + [chunk[:complete]]) if pending else chunk[:complete]
+                yield start, block
+
+                start += len(block)
+                pending, pending_size = [], 0
+                chunk = chunk[complete:]
+
+            if chunk:
+                pending.append(chunk)
+                pending_size += len(chunk)
+
+            if end is not None and start + pending_size >= end:
+                break
+
+        # last line, without a trailing new line
+        if pending:
+            yield start, b"".join(pending)
+
+    def _find_groups(self, block: bytes, offset: int):
+        """
+        Find all the group headers in a block of complete lines, checking only the lines that could be headers.
+
+        :param block: raw lines
+        :param offset: position of the block in the file
+        :return: yields each group and the block's content that comes before its header
+        """
+
+        position = checked = 0
+        for match in Group.HEADER_HINT.finditer(block):
+            # the line was already checked, for a previous match
+            if match.start() < checked:
+                continue
+
+            line_start = block.rfind(b"\n", 0, match.start()) + 1
+            checked = block.find(b"\n", match.end()) + 1 or len(block)
+
+            header = Group.BINARY_REGEX.match(block[line_start:checked])
+            if header is None:
+                continue
+
+            group = Group(self, header.group("name").decode(), offset + checked, self.overrides, offset + line_start)
+            yield group, block[position:line_start]
+            position = checked
+
+    def boundary(self, position: int, end: int = None) -> int:
+        """
+        Find the first group header that starts at or after a position, so the file can be split in regions that are
+        scanned independently.
+
+        :param position: any byte, not necessarily the start of a line
+        :param end: stop searching at this byte
+        :return: position of the group's header or `end` (the end of file), if there are no more groups
+        """
+
+        if end is None:
+            end = self.reader.stat().st_size
+
+        # start right before the position, so we know if it's the start of a line
+        lines = self.reader.lines(max(position - 1, 0))
+        if position > 0:
+            next(lines, None)
+
+        for start, _, line in lines:
+            if start >= end:
+                break
+
+            if Group.is_valid(line):
+                return start
+
+        return end
+
+    def new_hash(self):
+        """Create an empty hash, to be fed block by block."""
+
+        return self.hasher()
+
     def compute_hash(self, start: int, end: int) -> str:
-        """ Compute hash over a block. """
+        """Compute hash over a block."""
+
+        block = self.reader.block(start, end)
+
+        started = time.perf_counter() if self.metrics is not None else None
+        _hash = self.new_hash()
+        _hash.update(block)
+
+        if started is not None:
+            self.metrics.add("hash.seconds", time.perf_counter() - started)
 
-        return hashlib.sha256(self.reader.block(start, end).encode())
+        return _hash
 
     def fill_group(self, start: int, end: int) -> Property:
         """
@@ -58,9 +232,10 @@ class Scanner:
 
         :param start: start byte
         :param end: end byte
-        :return: yields properties
+        :return: yields properties, with raw values
         """
 
-        for line in self.reader.block(start, end).split("\n"):
-            if Property.is_valid(line):
-                yield Property.parse(line)
+        for line in self.reader.decode(self.reader.block(start, end)).split("\n"):
+            property = Property.lazy(line)
+            if property is not None:
+                yield property
@@ -0,0 +1,203 @@
+import contextlib
+import logging
+import mmap
+import os
+import struct
+from typing import NamedTuple, Optional, Tuple
+
+from configatron.digests import DEFAULT_DIGEST
+from configatron.engines import GroupTable
+
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+MAGIC = b"CFGS"
+VERSION = 2
+
+# magic, version, signature (modification time, size, inode), whether the signature can be trusted, digest's name,
+# source key's size and the source key, whether the index was validated, whether groups are shadowed by duplicates,
+# digest size, number of groups, size of the columns' items and size of the names' buffer
+HEADER = struct.Struct("<4sBqQQ?16sB64s??BQBQ")
+
+# columns start on a multiple of this, so they can be read in place
+ALIGNMENT = 8
+
+
+class Generation(NamedTuple):
+    signature: Optional[Tuple[int, int, int]]
+    source_key: str
+    validated: bool
+    shadowed: bool
+    preamble_hash: Optional[bytes]
+    digest: str = DEFAULT_DIGEST
+
+
+def aligned(position: int) -> int:
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+
+class SharedIndex:
+    """
+    Columnar index published in a file, which every process maps in memory, read-only, instead of building its own.
+
+    A new generation is written next to the current one and moved over it, so processes that mapped the previous one
+    keep reading it until they attach to the new one. Builds are serialized with a lock file, so only one process
+    builds a generation while the others wait for it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @contextlib.contextmanager
+    def lock(self):
+        """
+        Hold an exclusive lock, shared by all processes, while building a new generation.
+        Without `fcntl`, every process builds its own index.
+
+        :return: context manager
+        """
+
+        if fcntl is None:
+            yield
+            return
+
+        with open(f"{self.path}.lock", "wb") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def publish(self, generation: Generation, groups_index: GroupTable):
+        """
+        Publish a new generation, replacing the current one atomically. Failing to publish it is not fatal.
+
+        :param generation: Source's signature and content hash and how the index was built.
+        :param groups_index: Indexed groups.
+        :return: None
+        """
+
+        preamble_hash = generation.preamble_hash or b""
+        mtime, size, inode = generation.signature or (0, 0, 0)
+        source_key = bytes.fromhex(generation.source_key)
+
+        header = HEADER.pack(
+            MAGIC,
+            VERSION,
+            mtime,
+            size,
+            inode,
+            generation.signature is not None,
+            generation.digest.encode(),
+            len(source_key),
+            source_key,
+            generation.validated,
+            generation.shadowed,
+            len(preamble_hash),
+            len(groups_index),
+            groups_index.headers.itemsize,
+            len(groups_index.names),
+        )
+
+        chunks = [header, preamble_hash]
+        position = len(header) + len(preamble_hash)
+
+        for column in groups_index.columns() + (groups_index.names, groups_index.digests):
+            padding = aligned(position) - position
+            chunks += [b"\0" * padding, bytes(column)]
+            position += padding + len(chunks[-1])
+
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "wb") as shared:
+                shared.write(b"".join(chunks))
+
+            os.replace(temporary, self.path)
+        except OSError:
+            logging.warning(f"Failed to publish the index in {self.path}.", exc_info=True)
+
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    def attach(self, scanner: "Scanner") -> Optional[Tuple[Generation, GroupTable]]:
+        """
+        Map the current generation in memory. Groups are read from the mapping, without copying it.
+
+        :param scanner: Scanner over the snapshot of the source the groups will be read from.
+        :return: generation and its groups or None, if there's no valid generation.
+        """
+
+        try:
+            descriptor = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+
+        try:
+            if os.fstat(descriptor).st_size < HEADER.size:
+                return None
+
+            mapping = mmap.mmap(descriptor, 0, access=mmap.ACCESS_READ)
+        except OSError:
+            logging.warning(f"Failed to attach to the index in {self.path}.", exc_info=True)
+            return None
+        finally:
+            os.close(descriptor)
+
+        buffer = memoryview(mapping)
+
+        try:
+            (
+                magic,
+                version,
+                mtime,
+                size,
+                inode,
+                signed,
+                digest_name,
+                key_size,
+                source_key,
+                validated,
+                shadowed,
+                digest_size,
+                count,
+                itemsize,
+                names_size,
+            ) = HEADER.unpack_from(buffer)
+
+            if magic != MAGIC or version != VERSION or itemsize not in {4, 8}:
+                return None
+
+            digest_name = digest_name.rstrip(b"\0").decode()
+
+            position = HEADER.size
+            preamble_hash = bytes(buffer[position : position + digest_size]) if count else None
+            position += digest_size
+
+            # offsets (one more than the groups), positions sorted by name, headers, starts and ends
+            columns = []
+            for length in [count + 1, count, count, count, count]:
+                position = aligned(position)
+                columns.append(buffer[position : position + length * itemsize].cast("I" if itemsize == 4 else "Q"))
+                position += length * itemsize
+
+            position = aligned(position)
+            names = buffer[position : position + names_size]
+
+            position = aligned(position + names_size)
+            digests = buffer[position : position + count * digest_size]
+
+            if position + count * digest_size != len(buffer):
+                return None
+        except (struct.error, TypeError, ValueError):
+            logging.warning(f"Failed to attach to the index in {self.path}.", exc_info=True)
+            return None
+
+        signature = (mtime, size, inode) if signed else None
+        generation = Generation(signature, source_key[:key_size].hex(), validated, shadowed, preamble_hash, digest_name)
+
+        return generation, GroupTable(scanner, names, *columns, digests, digest_size)
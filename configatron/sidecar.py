@@ -0,0 +1,161 @@
+import logging
+import os
+import struct
+from typing import List, Mapping, NamedTuple, Optional, Tuple
+
+from configatron.digests import DEFAULT_DIGEST
+from configatron.nodes.group import Group
+
+
+MAGIC = b"CFGI"
+VERSION = 2
+
+# magic, version, signature (modification time, size, inode), whether the signature can be trusted, digest's name,
+# source key's size and the source key, whether the index was validated, whether groups are shadowed by duplicates,
+# digest size and number of groups
+HEADER = struct.Struct("<4sBqQQ?16sB64s??BI")
+
+# header, start and end of the group and the length of its name, followed by the name and the content's digest
+GROUP = struct.Struct("<QQQH")
+
+
+class State(NamedTuple):
+    signature: Optional[Tuple[int, int, int]]
+    source_key: str
+    validated: bool
+    shadowed: bool
+    preamble_hash: Optional[bytes]
+    groups: List[Tuple[str, int, int, int, bytes]]
+    digest: str
+
+
+class Sidecar:
+    """
+    Index saved next to the config file, so new processes can load it instead of scanning the entire file.
+
+    It holds only the groups' names, byte ranges and digests, keyed by the source's signature and content hash.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def dump(
+        self,
+        signature: Optional[Tuple[int, int, int]],
+        source_key: str,
+        validated: bool,
+        shadowed: bool,
+        preamble_hash: Optional[bytes],
+        groups_index: Mapping[str, Group],
+        digest: str = DEFAULT_DIGEST,
+    ):
+        """
+        Save the index, replacing the previous one atomically. Failing to save it is not fatal.
+
+        :param signature: Source's (modification time, size, inode) or None, if it can't be trusted.
+        :param source_key: Hash over source's content.
+        :param validated: The indexed groups were validated.
+        :param shadowed: Some groups are hidden by duplicates.
+        :param preamble_hash: Hash of the content before the first group.
+        :param groups_index: Indexed groups.
+        :param digest: Name of the hash used for the source key and the groups' digests.
+        :return: None
+        """
+
+        preamble_hash = preamble_hash or b""
+        mtime, size, inode = signature or (0, 0, 0)
+        source_key = bytes.fromhex(source_key)
+
+        chunks = [
+            HEADER.pack(
+                MAGIC,
+                VERSION,
+                mtime,
+                size,
+                inode,
+                signature is not None,
+                digest.encode(),
+                len(source_key),
+                source_key,
+                validated,
+                shadowed,
+                len(preamble_hash),
+                len(groups_index),
+            ),
+            preamble_hash,
+        ]
+
+        for group in groups_index.values():
+            name = group.name.encode()
+            chunks += [GROUP.pack(group.header, group.start, group.end, len(name)), name, group._hash]
+
+        # write it next to the sidecar and move it over, so other processes never load a partially written index
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "wb") as sidecar:
+                sidecar.write(b"".join(chunks))
+
+            os.replace(temporary, self.path)
+        except OSError:
+            logging.warning(f"Failed to save the index in {self.path}.", exc_info=True)
+
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    def load(self) -> Optional[State]:
+        """
+        Load the saved index. Missing, outdated or corrupted sidecars are ignored.
+
+        :return: saved state or None, if it can't be loaded.
+        """
+
+        try:
+            with open(self.path, "rb") as sidecar:
+                data = sidecar.read()
+
+            (
+                magic,
+                version,
+                mtime,
+                size,
+                inode,
+                signed,
+                digest_name,
+                key_size,
+                source_key,
+                validated,
+                shadowed,
+                digest_size,
+                count,
+            ) = HEADER.unpack_from(data)
+            if magic != MAGIC or version != VERSION:
+                return None
+
+            digest_name = digest_name.rstrip(b"\0").decode()
+
+            position = HEADER.size
+            preamble_hash = data[position : position + digest_size] if count else None
+            position += digest_size
+
+            groups = []
+            for _ in range(count):
+                header, start, end, length = GROUP.unpack_from(data, position)
+                position += GROUP.size
+
+                name = data[position : position + length].decode()
+                digest = data[position + length : position + length + digest_size]
+                position += length + digest_size
+
+                groups.append((name, header, start, end, digest))
+
+            if position != len(data):
+                return None
+        except FileNotFoundError:
+            return None
+        except (OSError, struct.error, UnicodeDecodeError):
+            logging.warning(f"Failed to load the index from {self.path}.", exc_info=True)
+            return None
+
+        signature = (mtime, size, inode) if signed else None
+        source_key = source_key[:key_size].hex()
+        return State(signature, source_key, validated, shadowed, preamble_hash, groups, digest_name)
@@ -0,0 +1,193 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from configatron import AsyncConfigatron, Configatron
+from configatron.aio import AsyncGroup
+from configatron.nodes.group import Group
+from configatron.utils import AsyncEmptyConfig
+
+
+FIXTURE = """[ftp]
+port = 21
+host = "ftp.example.com"
+
+[http]
+port = 80
+"""
+
+# far from the current time, so the config's signature is trusted
+MTIME = 1_000_000_000_000_000_000
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=4)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+def write(path, content):
+    with open(path, "w") as config:
+        config.write(content)
+
+    os.utime(path, ns=(MTIME, MTIME))
+
+
+def test_get_groups_and_properties():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.ini")
+        write(path, FIXTURE)
+
+        async def main():
+            config = await AsyncConfigatron.open(path)
+
+            ftp = await config.get("ftp")
+            assert isinstance(ftp, AsyncGroup)
+            assert ftp.name == "ftp"
+            assert await ftp.get("port") == 21
+            assert await ftp.get("host") == "ftp.example.com"
+
+            missing = await ftp.get("timeout")
+            assert missing == AsyncEmptyConfig()
+            assert await missing.get("anything") == {}
+
+            missing = await config.get("smtp")
+            assert missing == {}
+            assert await (await missing.get("port")).get("number") == {}
+
+            assert await (await config.get("http")).get("port") == 80
+
+            await config.close()
+
+        asyncio.run(main())
+
+
+def test_cached_lookups_do_not_use_the_executor():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.ini")
+        write(path, FIXTURE)
+
+        executor = CountingExecutor()
+
+        async def main():
+            config = AsyncConfigatron(Configatron(path), executor)
+
+            ftp = await config.get("ftp")
+            assert await ftp.get("port") == 21
+            assert await ftp.get("timeout") == {}
+            assert await config.get("smtp") == {}
+            loads = executor.submitted
+
+            for _ in range(10):
+                ftp = await config.get("ftp")
+                assert await ftp.get("port") == 21
+                assert await ftp.get("host") == "ftp.example.com"
+                assert await ftp.get("timeout") == {}
+                assert await config.get("smtp") == {}
+
+            return loads
+
+        with executor:
+            loads = asyncio.run(main())
+
+        # group load, group index, re-index for the missing property and the missing group
+        assert loads == 4
+        assert executor.submitted == loads
+
+
+def test_concurrent_loads_are_coalesced():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.ini")
+        write(path, FIXTURE)
+
+        executor = CountingExecutor()
+        config = Configatron(path)
+        load, index = config.load, Group.index
+
+        def slow(call):
+            def wrapper(*args):
+                time.sleep(0.05)
+                return call(*args)
+
+            return mock.Mock(wraps=wrapper)
+
+        config.load = slow(load)
+
+        async def main():
+            aconfig = AsyncConfigatron(config, executor)
+
+            groups = await asyncio.gather(*[aconfig.get("ftp") for _ in range(10)])
+            assert {group.group for group in groups} == {config.index.get("ftp")}
+
+            values = await asyncio.gather(*[group.get(name) for group in groups for name in ["port", "host"]])
+            assert values == [21, "ftp.example.com"] * 10
+
+            assert aconfig.pending == {}
+
+        with executor, mock.patch.object(Group, "index", autospec=True, side_effect=slow(index)) as indexed:
+            asyncio.run(main())
+
+        assert config.load.call_count == 1
+        assert indexed.call_count == 1
+        assert executor.submitted == 2
+
+
+def test_loads_do_not_block_the_event_loop():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.ini")
+        write(path, FIXTURE)
+
+        config = Configatron(path)
+        release = threading.Event()
+        load = config.load
+
+        def blocked(group_name):
+            release.wait(5)
+            return load(group_name)
+
+        config.load = blocked
+
+        async def main():
+            aconfig = AsyncConfigatron(config)
+            lookup = asyncio.ensure_future(aconfig.get("ftp"))
+
+            # the loop keeps running while the load waits
+            await asyncio.sleep(0.01)
+            assert not lookup.done()
+
+            release.set()
+            assert (await lookup).name == "ftp"
+
+        asyncio.run(main())
+
+
+def test_refresh_picks_up_changes():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.ini")
+        write(path, FIXTURE)
+
+        async def main():
+            config = await AsyncConfigatron.open(path, metrics=True)
+            assert await (await config.get("ftp")).get("port") == 21
+
+            write(path, FIXTURE.replace("21", "22") + "[smtp]\nport = 25\n")
+            os.utime(path, ns=(MTIME + 1, MTIME + 1))
+
+            refreshes = await asyncio.gather(config.refresh(), config.refresh())
+            assert refreshes[0] == refreshes[1]
+
+            assert await (await config.get("ftp")).get("port") == 22
+            assert await (await config.get("smtp")).get("port") == 25
+
+            assert config.validation_status() == {"status": "valid", "error": None}
+            assert config.stats()["index.builds.full"] >= 1
+
+        asyncio.run(main())
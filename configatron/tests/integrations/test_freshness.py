@@ -0,0 +1,166 @@
+import os
+import tempfile
+from unittest import mock
+
+import pytest
+
+from configatron import Configatron
+from configatron.index import Index
+from configatron.scanner import Scanner
+
+
+FIXTURE = """; preamble
+[ftp]
+port = 21
+
+[http]
+port = 80
+"""
+
+
+def rewrite(tmpfile, content):
+    tmpfile.seek(0)
+    tmpfile.truncate()
+    tmpfile.write(content.encode())
+    tmpfile.flush()
+
+
+@pytest.mark.parametrize(
+    "content, fresh",
+    [
+        (FIXTURE, {"ftp", "http"}),
+        (FIXTURE.replace("port = 21", "port = 22"), {"http"}),
+        (FIXTURE.replace("; preamble", "; comment!"), {"ftp", "http"}),
+        (FIXTURE.replace("; preamble", "; longer preamble"), set()),
+        (FIXTURE.replace("\n[http]", "\nhost = ftp\n[http]"), set()),
+        (FIXTURE.replace("[http]", "[https]"), {"ftp"}),
+        (FIXTURE + "timeout = 10\n", {"ftp"}),
+        (FIXTURE + "[smtp]\nport = 25\n", {"ftp", "http"}),
+        (FIXTURE[:-1], {"ftp"}),
+        (FIXTURE.replace("[http]", "[http] ; " + "x" * 1000), {"ftp"}),
+        (FIXTURE.replace("\n[http]", "\n; " + "x" * 1000 + "\n[http]"), set()),
+    ],
+)
+@pytest.mark.parametrize("reader", ["file", "mmap"])
+def test_group_is_fresh(content, fresh, reader):
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        rewrite(tmpfile, FIXTURE)
+
+        index = Index(tmpfile.name, reader=reader)
+        index.build()
+
+        rewrite(tmpfile, content)
+        scanner = Scanner(index.reader.snapshot())
+
+        assert {name for name, group in index.groups_index.items() if group.is_fresh(scanner)} == fresh
+
+
+def test_steady_reads_do_not_rebuild():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        rewrite(tmpfile, FIXTURE)
+
+        # the file was just modified, so its signature can't be trusted and every check reads it
+        config = Configatron(tmpfile.name, cache_options={"size": 1})
+        assert config.index.source_signature is None
+
+        with mock.patch.object(config.index, "build", wraps=config.index.build) as build:
+            for _ in range(100):
+                assert config.get("ftp").get("port") == 21
+                assert config.get("http").get("port") == 80
+
+            assert build.call_count == 0
+
+            rewrite(tmpfile, FIXTURE.replace("port = 80", "port = 8080"))
+
+            assert config.get("ftp").get("port") == 21
+            assert build.call_count == 0
+
+            assert config.get("http").get("port") == 8080
+            assert build.call_count == 1
+
+
+def settle(tmpfile, mtime):
+    # far from the current time, so the signature is trusted
+    os.utime(tmpfile.name, ns=(mtime, mtime))
+
+
+@pytest.mark.parametrize("engine", ["dict", "columnar"])
+def test_group_from_a_previous_index_is_not_fresh(engine):
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        rewrite(tmpfile, FIXTURE)
+        settle(tmpfile, 1_000_000_000_000_000_000)
+
+        config = Configatron(tmpfile.name, engine=engine)
+        previous = config.index.get("ftp")
+
+        # another thread re-indexes the edited file, right after this one got the group
+        rewrite(tmpfile, FIXTURE.replace("port = 21", "port = 2121"))
+        settle(tmpfile, 1_500_000_000_000_000_000)
+        config.index.build()
+
+        assert config.index.source_signature is not None
+        assert not config.index.is_fresh(previous)
+        assert config.index.is_fresh(config.index.get("ftp"))
+        assert config.index.is_fresh(config.index.get("http"))
+
+
+def test_group_is_not_cached_if_the_index_changed_while_loading():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        rewrite(tmpfile, FIXTURE)
+        settle(tmpfile, 1_000_000_000_000_000_000)
+
+        config = Configatron(tmpfile.name)
+        is_fresh = config.index.is_fresh
+        edits = [FIXTURE.replace("port = 21", "port = 2121")]
+
+        def racing(group):
+            fresh = is_fresh(group)
+
+            # another thread re-indexes the edited file and refreshes the cache, after the group was checked
+            if edits:
+                rewrite(tmpfile, edits.pop())
+                settle(tmpfile, 1_500_000_000_000_000_000)
+                config.refresh()
+
+            return fresh
+
+        with mock.patch.object(config.index, "is_fresh", side_effect=racing):
+            assert config.get("ftp") is config.index.get("ftp")
+
+        assert config.get("ftp") is config.index.get("ftp")
+        assert config.get("ftp").get("port") == 2121
+
+
+@pytest.mark.parametrize("reader", ["file", "mmap"])
+def test_checks_read_through_the_indexed_snapshot(reader):
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        path = os.path.join(directory, "config.ini")
+        with open(path, "w") as config_file:
+            config_file.write(FIXTURE)
+
+        config = Configatron(path, reader=reader, cache_options={"size": 1})
+        index = config.index
+
+        # an edit of a group nobody reads, in place, changes the signature without re-indexing
+        with open(path, "r+") as config_file:
+            config_file.write(FIXTURE.replace("port = 80", "port = 88"))
+
+        with mock.patch.object(index.reader, "snapshot", wraps=index.reader.snapshot) as snapshot:
+            for _ in range(10):
+                assert index.is_fresh(index.get("ftp"))
+                assert not index.is_fresh(index.get("http"))
+                assert config.get("ftp").get("port") == 21
+
+            assert snapshot.call_count == 0
+
+            # a replaced file can't be read through the indexed snapshot, so it's re-indexed once
+            with open(f"{path}.tmp", "w") as config_file:
+                config_file.write(FIXTURE.replace("port = 80", "port = 8080"))
+            os.replace(f"{path}.tmp", path)
+
+            assert not index.is_fresh(index.get("ftp"))
+            for _ in range(10):
+                assert config.get("ftp").get("port") == 21
+                assert config.get("http").get("port") == 8080
+
+            assert snapshot.call_count == 1
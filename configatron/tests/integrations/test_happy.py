@@ -1,3 +1,5 @@
+import tempfile
+
 from configatron import Configatron
 
 
@@ -39,3 +41,53 @@ def test_small_cache_lifespan():
     assert config.get("test").get("number") == 123
     assert config.get("test").get("string") == "val"
     assert config.get("test").get("invalid") == {}
+
+
+def test_non_ascii_content():
+    fixture = """
+; configurație în română ⛔️
+[first] ; ünïcödé
+path = /a/b/c
+
+; ✓ more comments
+[second]
+number = 123
+string = "val"
+"""
+
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(fixture.encode())
+        tmpfile.flush()
+
+        config = Configatron(tmpfile.name)
+
+        assert config.get("first").get("path") == "/a/b/c"
+        assert config.get("second").get("number") == 123
+        assert config.get("second").get("string") == "val"
+
+
+def test_mmap_reader():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"[ftp]\nport = 21\n")
+        tmpfile.flush()
+
+        config = Configatron(tmpfile.name, reader="mmap", cache_options={"lifespan": 0})
+        assert config.get("ftp").get("port") == 21
+
+        tmpfile.seek(0)
+        tmpfile.truncate()
+        tmpfile.write(b"[ftp]\nport = 2121\n\n[ssh]\nport = 22\n")
+        tmpfile.flush()
+
+        assert config.get("ftp").get("port") == 2121
+        assert config.get("ssh").get("port") == 22
+
+
+def test_columnar_engine():
+    config = Configatron("configatron/tests/integrations/fixtures/simple.ini", engine="columnar")
+
+    assert config.get("test").get("path") == "/a/b/c"
+    assert config.get("test").get("over") == "blend"
+    assert config.get("test2").get("number") == 123
+    assert config.get("test3").get("simple") == ["a", "b", "c"]
+    assert config.get("missing") == {}
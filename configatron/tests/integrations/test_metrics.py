@@ -0,0 +1,95 @@
+import tempfile
+import time
+from unittest import mock
+
+import pytest
+
+from configatron import Configatron
+
+
+FIXTURE = b"""; preamble
+[ftp]
+port = 21
+
+[http]
+port = 80
+"""
+
+
+@pytest.mark.parametrize("reader", ["file", "mmap"])
+def test_metrics(reader):
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(FIXTURE)
+        tmpfile.flush()
+
+        hook = mock.Mock()
+        config = Configatron(tmpfile.name, reader=reader, metrics_hook=hook)
+
+        assert config.get("ftp").get("port") == 21
+        assert config.get("ftp").get("port") == 21
+        assert config.get("smtp") == {}
+
+        stats = config.stats()
+
+        assert stats["cache.hits"] == 1
+        assert stats["cache.misses"] == 2
+        assert stats["index.builds.full"] == 1
+        assert stats["groups.indexed"] == 1
+        assert stats["reader.bytes"] >= len(FIXTURE)
+        assert stats["index.build.seconds"] > 0
+        assert stats["index.scan.seconds"] > 0
+        assert stats["hash.seconds"] > 0
+
+        assert mock.call("index.builds.full", 1) in hook.call_args_list
+
+
+def test_metrics_are_disabled_by_default():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(FIXTURE)
+        tmpfile.flush()
+
+        config = Configatron(tmpfile.name)
+        assert config.get("ftp").get("port") == 21
+
+        assert config.metrics is None
+        assert config.stats() == {}
+
+
+@pytest.mark.parametrize("reader", ["file", "mmap"])
+def test_disabled_metrics_are_not_timed(reader):
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(FIXTURE)
+        tmpfile.flush()
+
+        with mock.patch.object(time, "perf_counter", wraps=time.perf_counter) as perf_counter:
+            config = Configatron(tmpfile.name, reader=reader)
+            assert config.get("ftp").get("port") == 21
+            assert config.index.is_fresh(config.get("http"))
+
+            tmpfile.write(b"[smtp]\nport = 25\n")
+            tmpfile.flush()
+            config.refresh()
+
+        assert perf_counter.call_count == 0
+
+
+def test_mapped_lines_are_counted_once():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(FIXTURE * 100)
+        tmpfile.flush()
+
+        config = Configatron(tmpfile.name, reader="mmap", validate=False, metrics=True)
+        reader = config.index.scanner.reader
+
+        with mock.patch.object(config.metrics, "add", wraps=config.metrics.add) as add:
+            assert len(list(reader.lines())) == FIXTURE.count(b"\n") * 100
+
+            # lines read only in part are counted too
+            partial = reader.lines(len(FIXTURE))
+            next(partial)
+            partial.close()
+
+        assert add.call_args_list == [
+            mock.call("reader.bytes", len(FIXTURE) * 100),
+            mock.call("reader.bytes", len(b"; preamble\n")),
+        ]
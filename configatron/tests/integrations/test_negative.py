@@ -0,0 +1,131 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from configatron import Configatron
+from configatron.lru import NegativeCache
+from configatron.nodes.group import Group
+
+
+# far from the current time, so the config's signature is trusted
+MTIME = 1_000_000_000_000_000_000
+
+
+def write(tmpfile, content, mtime=MTIME):
+    tmpfile.write(content)
+    tmpfile.flush()
+
+    os.utime(tmpfile.name, ns=(mtime, mtime))
+
+
+def test_missing_group_is_remembered():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        write(tmpfile, b"[ftp]\nport = 21\n")
+
+        config = Configatron(tmpfile.name)
+
+        with mock.patch.object(config.index, "build", wraps=config.index.build) as build:
+            assert config.get("missing") == {}
+            assert config.get("missing") == {}
+            assert config.get("missing") == {}
+
+        assert build.call_count == 1
+        assert config.negative.stats() == {"hits": 2, "misses": 1, "size": 1}
+
+
+def test_missing_property_is_remembered():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"[ftp]\nport = 21\n")
+        tmpfile.flush()
+
+        config = Configatron(tmpfile.name)
+        group = config.get("ftp")
+
+        with mock.patch.object(Group, "index", autospec=True, side_effect=Group.index) as index:
+            assert group.get("missing") == {}
+            assert group.get("missing") == {}
+
+        assert index.call_count == 1
+        assert config.negative.stats()["hits"] == 1
+
+
+def test_missing_items_are_forgotten_on_reindex():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"[ftp]\nport = 21\n")
+        tmpfile.flush()
+
+        config = Configatron(tmpfile.name)
+        assert config.get("ssh") == {}
+
+        tmpfile.write(b"[ssh]\nport = 22\n")
+        tmpfile.flush()
+
+        # the file changed, so the missing group is looked up again
+        assert config.get("ssh").get("port") == 22
+
+
+def test_missing_groups_are_looked_up_again_when_the_file_changes():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        write(tmpfile, b"[a]\nport = 21\n")
+
+        config = Configatron(tmpfile.name)
+        assert config.get("b") == {}
+
+        # the file's signature didn't change, so the group is still missing, without a re-index
+        with mock.patch.object(config.index, "build", wraps=config.index.build) as build:
+            assert config.get("b") == {}
+
+        assert build.call_count == 0
+
+        write(tmpfile, b"[b]\nport = 22\n", MTIME + 1)
+
+        assert config.get("b").get("port") == 22
+
+
+def test_missing_groups_of_watched_files_are_not_checked():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        write(tmpfile, b"[a]\nport = 21\n")
+
+        config = Configatron(tmpfile.name, watch=True)
+        try:
+            assert config.get("b") == {}
+
+            with mock.patch.object(config.index, "is_current") as is_current:
+                assert config.get("b") == {}
+
+            assert is_current.call_count == 0
+        finally:
+            config.close()
+
+
+def test_missing_items_expire():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"[ftp]\nport = 21\n")
+        tmpfile.flush()
+
+        config = Configatron(tmpfile.name, cache_options={"negative_lifespan": 0})
+        assert config.get("ssh") == {}
+
+        tmpfile.write(b"[ssh]\nport = 22\n")
+        tmpfile.flush()
+
+        assert config.get("ssh").get("port") == 22
+
+
+def test_concurrent_lookups_are_all_counted():
+    negative = NegativeCache(100, 60)
+    negative.add("missing")
+
+    def lookup():
+        for _ in range(10000):
+            negative.contains("missing")
+            negative.contains("present")
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert negative.stats() == {"hits": 80000, "misses": 80000, "size": 1}
@@ -43,3 +43,48 @@ def test_overrides(fixture, expected):
 
         config = Configatron(tmpfile.name, ["production", "staging"])
         assert config.get("ftp").get("flag") == expected
+
+
+def test_overrides_are_resolved_on_index():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"""[ftp]
+port<staging> = 2121
+port = 21
+port<production> = 2222
+port<staging> = 2323
+path<development> = /dev
+name<staging> = "staging"
+""")
+        tmpfile.flush()
+
+        config = Configatron(tmpfile.name, ["production", "staging"])
+        group = config.get("ftp")
+
+        # looking up a missing property indexes the group again
+        assert group.get("path") == {}
+        assert group.get("port") == 2323
+        assert group.get("name") == "staging"
+        assert group.properties == {"port": 2323, "name": "staging"}
+
+        assert Configatron(tmpfile.name).get("ftp").get("name") == {}
+
+
+@pytest.mark.parametrize(
+    "fixture, expected",
+    [
+        ("x = 21\nx<staging> = abc\n", 21),
+        ("x<staging> = 2121\nx<staging> = abc\nx = 21\n", 2121),
+        ("x = abc\nx<production> = def\nx<staging> = 2121\n", 2121),
+        ("x = 21\nx = abc\n", 21),
+        ("x = abc\nx<staging> = def\n", {}),
+    ],
+)
+def test_invalid_values_fall_back_to_the_next_priority(fixture, expected):
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"[ftp]\n" + fixture.encode())
+        tmpfile.flush()
+
+        # invalid values are ignored, like invalid lines
+        config = Configatron(tmpfile.name, ["production", "staging"], validate=False)
+        assert config.get("ftp").get("x") == expected
+        assert config.get("ftp").get("x") == expected
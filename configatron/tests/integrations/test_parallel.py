@@ -0,0 +1,88 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+import pytest
+
+from configatron import Configatron
+from configatron.errors import ValidationError
+from configatron.index import Index
+
+
+def generate(path, groups):
+    with open(path, "w") as config:
+        config.write("; preamble\n\n")
+
+        for group in range(groups):
+            config.write(f"[group{group}] ; comment\nnumber = {group}\npath = /a/b/{group}\n\n")
+
+
+def snapshot(index):
+    return [
+        (group.name, group.header, group.start, group.end, group._hash)
+        for group in sorted(index.groups_index.values(), key=lambda group: group.header)
+    ]
+
+
+@pytest.mark.parametrize("workers", [2, 3, 7])
+def test_parallel_build_matches_serial_build(workers):
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        path = os.path.join(directory, "config.ini")
+        generate(path, 100)
+
+        serial = Index(path)
+        serial.build(True)
+
+        parallel = Index(path, workers=workers)
+        with mock.patch("configatron.index.MIN_CHUNK_SIZE", 1):
+            with mock.patch("configatron.index.ProcessPoolExecutor", wraps=ProcessPoolExecutor) as pool:
+                parallel.build(True)
+
+        assert pool.call_count == 1
+        assert snapshot(parallel) == snapshot(serial)
+
+
+def test_duplicates_are_detected_across_regions():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        path = os.path.join(directory, "config.ini")
+        generate(path, 100)
+
+        with open(path, "a") as config:
+            config.write("[group0]\nnumber = 0\n")
+
+        index = Index(path, workers=4)
+        with mock.patch("configatron.index.MIN_CHUNK_SIZE", 1):
+            with pytest.raises(ValidationError):
+                index.build(True)
+
+            index.build(False)
+
+        assert index.shadowed
+        assert index.get("group0").start > index.get("group99").start
+
+
+def test_invalid_config_is_detected_in_any_region():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        path = os.path.join(directory, "config.ini")
+        generate(path, 100)
+
+        with open(path, "a") as config:
+            config.write("[invalid]\nnumber = {}\n")
+
+        with mock.patch("configatron.index.MIN_CHUNK_SIZE", 1):
+            with pytest.raises(ValidationError):
+                Configatron(path, workers=4)
+
+
+def test_parallel_config():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        path = os.path.join(directory, "config.ini")
+        generate(path, 100)
+
+        with mock.patch("configatron.index.MIN_CHUNK_SIZE", 1):
+            config = Configatron(path, workers=4)
+
+        assert config.get("group0").get("number") == 0
+        assert config.get("group50").get("path") == "/a/b/50"
+        assert config.get("group99").get("number") == 99
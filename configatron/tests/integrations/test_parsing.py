@@ -1,8 +1,10 @@
 import tempfile
+from unittest import mock
 
 import pytest
 
 from configatron import Configatron
+from configatron.nodes.property import Property, Raw
 
 
 @pytest.mark.parametrize(
@@ -241,3 +243,26 @@ def test_parse_bool(fixture, expected):
 
         config = Configatron(tmpfile.name)
         assert config.get("ftp").get("flag") == expected
+
+
+def test_values_are_decoded_once_on_lookup():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"[ftp]\nport = 21\npath = /srv/ftp\nname = ftp\n")
+        tmpfile.flush()
+
+        config = Configatron(tmpfile.name, validate=False)
+        group = config.get("ftp")
+
+        with mock.patch.object(Property, "decode", wraps=Property.decode) as decode:
+            group.index()
+            assert decode.call_count == 0
+
+            assert group.get("port") == 21
+            assert group.get("port") == 21
+            assert decode.call_count == 1
+
+        assert group.properties["port"] == 21
+        assert type(group.properties["path"]) is Raw
+
+        # values that can't be decoded are ignored
+        assert group.get("name") == {}
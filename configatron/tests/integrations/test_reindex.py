@@ -0,0 +1,265 @@
+import gc
+import os
+import random
+import tempfile
+from unittest import mock
+
+import pytest
+
+from configatron import Configatron, index as index_module
+from configatron.digests import DIGESTS
+from configatron.engines import MAX_SPLICES, GroupSplice
+from configatron.index import Index
+
+
+FIXTURE = """; preamble
+
+[first] ; comment
+a = 1
+b = "two"
+
+[second]
+c = /a/b
+
+[third]
+d = yes
+e = 1,2,3
+[fourth]
+f = -1.5
+"""
+
+
+def snapshot(index):
+    return [
+        (group.name, group.header, group.start, group.end, group._hash)
+        for group in sorted(index.groups_index.values(), key=lambda group: group.header)
+    ]
+
+
+@pytest.fixture(params=[64 * 1024, 8], ids=["chunks", "small-chunks"])
+def chunk_size(request, monkeypatch):
+    # small chunks find regions smaller than the fixture, which are spliced in the index
+    monkeypatch.setattr(index_module, "CHANGE_CHUNK_SIZE", request.param)
+    return request.param
+
+
+def rewrite(tmpfile, content):
+    tmpfile.seek(0)
+    tmpfile.truncate()
+    tmpfile.write(content.encode())
+    tmpfile.flush()
+
+
+@pytest.mark.parametrize(
+    "content, changed",
+    [
+        (FIXTURE, set()),
+        (FIXTURE.replace("c = /a/b", "c = /a/b/c/d"), {"second"}),
+        (FIXTURE.replace("c = /a/b", "c = /c/d"), {"second"}),
+        (FIXTURE.replace("a = 1", "a = 123456"), {"first"}),
+        (FIXTURE.replace("f = -1.5", "f = -1.5\ng = 2"), {"fourth"}),
+        (FIXTURE.replace("; preamble", ""), set()),
+        (FIXTURE.replace("; preamble", "[zero]\nz = 0"), {"zero"}),
+        (FIXTURE.replace("; preamble", "; comment!"), set()),
+        (FIXTURE.replace("[third]", "[renamed]"), {"third", "renamed"}),
+        (FIXTURE.replace("[third]", "; removed"), {"second", "third"}),
+        (FIXTURE.replace("[fourth]", "[fourth]\n[fifth]"), {"fourth", "fifth"}),
+        (FIXTURE + "[fifth]\n", {"fifth"}),
+        (FIXTURE.replace("d = yes", "d = yes\n[first]"), None),
+    ],
+)
+@pytest.mark.parametrize("engine", ["dict", "columnar"])
+def test_reindex_changed_region(content, changed, engine, chunk_size):
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        rewrite(tmpfile, FIXTURE)
+
+        index = Index(tmpfile.name, engine=engine)
+        index.build(True)
+
+        rewrite(tmpfile, content)
+
+        assert index.build() == changed
+
+        expected = Index(tmpfile.name)
+        expected.build()
+
+        assert snapshot(index) == snapshot(expected)
+
+
+@pytest.mark.parametrize("seed", range(50))
+@pytest.mark.parametrize("engine", ["dict", "columnar"])
+@pytest.mark.parametrize("digest", DIGESTS)
+def test_reindex_random_edits(seed, engine, digest, chunk_size):
+    rand = random.Random(seed)
+    lines = FIXTURE.splitlines(keepends=True)
+    edits = ["x = 1\n", "\n", "; comment\n", "[new]\n", "[first]\n", "y = /a\n", "[second] ; moved\n"]
+
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        rewrite(tmpfile, FIXTURE)
+
+        index = Index(tmpfile.name, engine=engine, digest=digest)
+        index.build()
+
+        for _ in range(MAX_SPLICES + 3):
+            position = rand.randrange(len(lines) + 1)
+            if lines and rand.random() < 0.5:
+                del lines[min(position, len(lines) - 1)]
+            else:
+                lines.insert(position, rand.choice(edits))
+
+            rewrite(tmpfile, "".join(lines))
+            index.build()
+
+            expected = Index(tmpfile.name, digest=digest)
+            expected.build()
+
+            assert {name: group.start for name, group in index.groups_index.items()} == {
+                name: group.start for name, group in expected.groups_index.items()
+            }
+            assert snapshot(index) == snapshot(expected)
+
+
+@pytest.mark.parametrize("engine", ["dict", "columnar"])
+def test_reindex_splices_only_the_changed_region(engine, monkeypatch):
+    monkeypatch.setattr(index_module, "CHANGE_CHUNK_SIZE", 16)
+
+    fixture = "".join(f"[group{number}]\nvalue = {number}\n" for number in range(100))
+
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        rewrite(tmpfile, fixture)
+
+        index = Index(tmpfile.name, engine=engine)
+        index.build()
+
+        for edit in range(1, MAX_SPLICES + 2):
+            fixture = fixture.replace(f"value = {edit * 10}\n", f"value = {edit * 1000}\n")
+            rewrite(tmpfile, fixture)
+
+            scan = index._scan
+            with mock.patch.object(index, "_scan", side_effect=scan) as scanned:
+                assert index.build() == {f"group{edit * 10}"}
+
+            # only a few groups around the edit are scanned again
+            (_, _, start, end), _ = scanned.call_args
+            assert end - start < 100
+
+            # and the groups after it moved
+            expected = Index(tmpfile.name)
+            expected.build()
+            assert snapshot(index) == snapshot(expected)
+            assert index.get(f"group{edit * 10}").get("value") == edit * 1000
+            assert index.get("group99").scanner is index.scanner
+
+            # stacked splices are built again from all their groups
+            assert isinstance(index.groups_index, GroupSplice) == (edit <= MAX_SPLICES)
+
+
+def test_reindex_keeps_cached_groups():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        rewrite(tmpfile, FIXTURE)
+
+        config = Configatron(tmpfile.name)
+        first, second, fourth = config.get("first"), config.get("second"), config.get("fourth")
+        assert fourth.get("f") == -1.5
+
+        rewrite(tmpfile, FIXTURE.replace("c = /a/b", "c = /a/b/c/d"))
+        config.refresh()
+
+        # kept groups are copies too, bound to the new snapshot, sharing the already indexed properties
+        assert config.get("first") is not first
+        assert config.get("first").properties is first.properties
+        assert config.get("first").scanner is config.index.scanner
+        assert config.get("second") is not second
+        assert config.get("second").get("c") == "/a/b/c/d"
+
+        # moved groups are copies, sharing the already indexed properties
+        assert config.get("fourth") is not fourth
+        assert config.get("fourth").start == fourth.start + len("/c/d")
+        assert config.get("fourth").properties is fourth.properties
+        assert config.get("fourth").get("f") == -1.5
+
+
+@pytest.mark.parametrize("engine", ["dict", "columnar"])
+def test_reindex_keeps_cached_properties_of_unchanged_groups(engine):
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        rewrite(tmpfile, FIXTURE)
+
+        config = Configatron(tmpfile.name, engine=engine)
+        first, third = config.get("first"), config.get("third")
+        assert first.get("a") == 1
+        assert third.get("e") == ["1", "2", "3"]
+
+        # every group after the first one is moved
+        rewrite(tmpfile, FIXTURE.replace("a = 1", "a = 123456"))
+        config.refresh()
+
+        assert config.get("first").get("a") == 123456
+        assert config.get("third") is not third
+        assert config.get("third").properties is third.properties
+
+
+def test_rebuild_keeps_cached_groups_with_the_same_content():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        # duplicates can't be re-indexed incrementally, so the entire file is indexed again
+        fixture = FIXTURE + "[first]\na = 2\n"
+        rewrite(tmpfile, fixture)
+
+        config = Configatron(tmpfile.name, validate=False)
+        first, third = config.get("first"), config.get("third")
+        assert first.get("a") == 2
+        assert third.get("d") is True
+
+        assert config.index.shadowed
+
+        rewrite(tmpfile, fixture.replace("a = 2", "a = 3"))
+        config.refresh()
+
+        assert config.get("first").get("a") == 3
+        assert config.get("third") is not third
+        assert config.get("third").properties is third.properties
+
+
+def open_descriptors():
+    gc.collect()
+    return len(os.listdir("/proc/self/fd"))
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc/self/fd")
+@pytest.mark.parametrize("engine", ["dict", "columnar"])
+@pytest.mark.parametrize("reader", ["file", "mmap"])
+def test_refreshes_release_previous_snapshots(reader, engine, chunk_size):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "config.ini")
+        with open(path, "w") as config_file:
+            config_file.write(FIXTURE)
+
+        config = Configatron(path, reader=reader, engine=engine)
+        for name in ["first", "second", "third", "fourth"]:
+            config.get(name).get("a")
+
+        opened = open_descriptors()
+
+        # appended groups keep all the others, each one found in another snapshot
+        for edit in range(100):
+            with open(path, "a") as config_file:
+                config_file.write(f'[appended{edit}]\nvalue = "v{edit}"\n')
+            config.refresh()
+
+            assert config.get(f"appended{edit}").get("value") == f"v{edit}"
+
+        # replaced files keep the groups before the edited one
+        for edit in range(100):
+            with open(path) as config_file:
+                content = config_file.read().replace(f'value = "v{edit}"\n', f'value = "w{edit}"\n')
+            with open(f"{path}.tmp", "w") as config_file:
+                config_file.write(content)
+            os.replace(f"{path}.tmp", path)
+            config.refresh()
+
+            assert config.get(f"appended{edit}").get("value") == f"w{edit}"
+            assert config.get("first").get("a") == 1
+
+            # spliced indexes keep the snapshots of the groups they kept, up to a file and a mapping each
+            assert open_descriptors() <= opened + 1 + 2 * MAX_SPLICES
+
+        assert open_descriptors() <= opened + 1
@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+import tempfile
+from unittest import mock
+
+from configatron import Configatron
+from configatron.index import Index
+
+
+CONTENT = b"; preamble\n[ftp]\nport = 21\npath = /srv/ftp\n[http]\nport = 80\n"
+
+
+def write(path, content, mtime=1_000_000_000_000_000_000):
+    with open(path, "wb") as config:
+        config.write(content)
+
+    os.utime(path, ns=(mtime, mtime))
+
+
+def build(source, shared):
+    Configatron(source, shared=shared)
+
+
+def test_index_is_built_once():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        source, shared = os.path.join(directory, "config.ini"), os.path.join(directory, "config.shm")
+        write(source, CONTENT)
+
+        process = multiprocessing.Process(target=build, args=(source, shared))
+        process.start()
+        process.join()
+
+        assert process.exitcode == 0 and os.path.exists(shared)
+
+        with mock.patch.object(Index, "_scan") as scan:
+            config = Configatron(source, shared=shared)
+
+            assert config.get("ftp").get("port") == 21
+            assert config.get("ftp").get("path") == "/srv/ftp"
+            assert config.get("http").get("port") == 80
+            assert config.get("smtp") == {}
+
+        assert scan.call_count == 0
+        assert isinstance(config.index.groups_index.names, memoryview)
+
+
+def test_new_generations_are_picked_up():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        source, shared = os.path.join(directory, "config.ini"), os.path.join(directory, "config.shm")
+        write(source, CONTENT)
+
+        builder = Configatron(source, shared=shared)
+        reader = Configatron(source, shared=shared)
+        stale = Configatron(source, shared=shared)
+        assert reader.get("ftp").get("port") == 21
+
+        write(source, CONTENT.replace(b"port = 21", b"port = 2121"), 1_500_000_000_000_000_000)
+        builder.refresh()
+
+        with mock.patch.object(Index, "_scan") as scan:
+            reader.refresh()
+
+            assert reader.get("ftp").get("port") == 2121
+
+        assert scan.call_count == 0
+
+        # the previous generation is still readable by those who didn't pick up the new one
+        assert stale.index.get("http").header == CONTENT.index(b"[http]")
+        assert reader.index.get("http").header == CONTENT.index(b"[http]") + 2
+
+
+def test_outdated_or_corrupted_index_is_rebuilt():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        source, shared = os.path.join(directory, "config.ini"), os.path.join(directory, "config.shm")
+        write(source, CONTENT)
+
+        Configatron(source, shared=shared)
+        write(source, b"[smtp]\nport = 25\n" + CONTENT, 1_500_000_000_000_000_000)
+
+        config = Configatron(source, shared=shared)
+        assert config.get("smtp").get("port") == 25
+
+        with open(shared, "r+b") as corrupted:
+            corrupted.truncate(100)
+
+        config = Configatron(source, shared=shared)
+        assert config.get("smtp").get("port") == 25
+        assert config.get("ftp").get("port") == 21
+        assert os.path.getsize(shared) > 100
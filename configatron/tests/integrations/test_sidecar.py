@@ -0,0 +1,133 @@
+import os
+import tempfile
+from unittest import mock
+
+from configatron import Configatron
+from configatron.index import Index
+from configatron.scanner import Scanner
+from configatron.sidecar import Sidecar
+
+
+CONTENT = b"; preamble\n[ftp]\nport = 21\npath = /srv/ftp\n[http]\nport = 80\n"
+
+
+def write(path, content, mtime=1_000_000_000_000_000_000):
+    with open(path, "wb") as config:
+        config.write(content)
+
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_index_is_loaded_from_sidecar():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        source, sidecar = os.path.join(directory, "config.ini"), os.path.join(directory, "config.idx")
+        write(source, CONTENT)
+
+        Configatron(source, sidecar=sidecar)
+        assert os.path.exists(sidecar)
+
+        with mock.patch.object(Scanner, "groups") as groups:
+            config = Configatron(source, sidecar=sidecar)
+
+            assert config.get("ftp").get("port") == 21
+            assert config.get("http").get("port") == 80
+            assert config.get("smtp") == {}
+
+        assert groups.call_count == 0
+
+
+def test_sidecar_is_loaded_when_only_metadata_changed():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        source, sidecar = os.path.join(directory, "config.ini"), os.path.join(directory, "config.idx")
+        write(source, CONTENT)
+
+        Configatron(source, sidecar=sidecar)
+        write(source, CONTENT, 1_500_000_000_000_000_000)
+
+        with mock.patch.object(Scanner, "groups") as groups:
+            config = Configatron(source, sidecar=sidecar)
+
+            assert config.get("ftp").get("path") == "/srv/ftp"
+
+        assert groups.call_count == 0
+
+
+def test_outdated_sidecar_is_ignored():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        source, sidecar = os.path.join(directory, "config.ini"), os.path.join(directory, "config.idx")
+        write(source, CONTENT)
+
+        Configatron(source, sidecar=sidecar)
+        write(source, b"[smtp]\nport = 25\n" + CONTENT, 1_500_000_000_000_000_000)
+
+        config = Configatron(source, sidecar=sidecar)
+
+        assert config.get("smtp").get("port") == 25
+        assert config.get("ftp").get("port") == 21
+
+
+def test_unvalidated_sidecar_is_not_loaded_when_validating():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        source, sidecar = os.path.join(directory, "config.ini"), os.path.join(directory, "config.idx")
+        write(source, CONTENT)
+
+        Configatron(source, validate=False, sidecar=sidecar).get("ftp")
+
+        with mock.patch.object(Scanner, "groups", wraps=Scanner.groups, autospec=True) as groups:
+            Configatron(source, sidecar=sidecar)
+
+        assert groups.call_count == 1
+
+
+def test_sidecar_with_another_digest_is_ignored():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        source, sidecar = os.path.join(directory, "config.ini"), os.path.join(directory, "config.idx")
+        write(source, CONTENT)
+
+        Configatron(source, sidecar=sidecar, digest="crc32")
+        assert Sidecar(sidecar).load().digest == "crc32"
+
+        # scanned again and saved with the new digest
+        config = Configatron(source, sidecar=sidecar)
+        assert config.get("ftp").get("port") == 21
+        assert Sidecar(sidecar).load().digest == "sha256"
+
+        with mock.patch.object(Scanner, "groups") as groups:
+            config = Configatron(source, sidecar=sidecar)
+
+            assert config.get("ftp").get("port") == 21
+            assert groups.call_count == 0
+
+
+def test_incremental_refresh_saves_sidecar_without_hashing_the_source():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        source, sidecar = os.path.join(directory, "config.ini"), os.path.join(directory, "config.idx")
+        write(source, CONTENT)
+
+        # the entire file is scanned anyway, so its key is saved as well
+        config = Configatron(source, sidecar=sidecar)
+        assert Sidecar(sidecar).load().source_key
+
+        write(source, CONTENT.replace(b"port = 80", b"port = 8080"), 1_500_000_000_000_000_000)
+        with mock.patch.object(Index, "_compute_source_key", wraps=config.index._compute_source_key) as source_key:
+            assert config.refresh() == {"http"}
+
+        assert source_key.call_count == 0
+        assert Sidecar(sidecar).load().source_key == ""
+
+        # matched by its signature only, but refreshes don't validate
+        with mock.patch.object(Scanner, "groups") as groups:
+            config = Configatron(source, sidecar=sidecar, validate=False)
+
+            assert config.get("http").get("port") == 8080
+
+        assert groups.call_count == 0
+
+        # so it can't be matched once the signature changes, even if the content didn't
+        write(source, CONTENT.replace(b"port = 80", b"port = 8080"), 1_600_000_000_000_000_000)
+        with mock.patch.object(Index, "_scan", autospec=True, side_effect=Index._scan) as scan:
+            config = Configatron(source, sidecar=sidecar, validate=False)
+
+            assert config.get("http").get("port") == 8080
+
+        assert scan.call_count == 1
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from configatron import Configatron
+from configatron.index import Index
+
+
+def write(tmpfile, content):
+    tmpfile.seek(0)
+    tmpfile.truncate()
+    tmpfile.write(content)
+    tmpfile.flush()
+
+
+def replace(path, content):
+    with open(path + ".new", "wb") as config:
+        config.write(content)
+
+    os.replace(path + ".new", path)
+
+
+def test_concurrent_builds_are_coalesced():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        write(tmpfile, b"[ftp]\nport = 21\n")
+
+        index = Index(tmpfile.name)
+        building, release = threading.Event(), threading.Event()
+        build = index._build
+
+        def slow_build(validate):
+            building.set()
+            release.wait()
+            return build(validate)
+
+        with mock.patch.object(index, "_build", side_effect=slow_build) as _build:
+            leader = threading.Thread(target=index.build)
+            leader.start()
+            building.wait()
+
+            followers = [threading.Thread(target=index.build) for _ in range(8)]
+            for follower in followers:
+                follower.start()
+
+            release.set()
+            for thread in [leader] + followers:
+                thread.join()
+
+        assert _build.call_count == 1
+        assert index.get("ftp") is not None
+
+
+def test_concurrent_reads_while_the_file_changes():
+    versions = [
+        b'[ftp]\nport = 21\nuser = "ftp"\n\n[ssh]\nport = 22\n',
+        b'; moved\n[ftp]\nport = 2121\nuser = "ftp"\n\n[ssh]\nport = 22\n[http]\nport = 80\n',
+    ]
+    expected = {"ftp": {21, 2121}, "ssh": {22}, "http": {80, None}}
+
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        path = os.path.join(directory, "config.ini")
+        replace(path, versions[0])
+
+        config = Configatron(path, cache_options={"lifespan": 0, "negative_lifespan": 0, "shards": 4})
+        errors = []
+
+        def read():
+            try:
+                for _ in range(50):
+                    for name, ports in expected.items():
+                        port = config.get(name).get("port")
+                        assert (None if port == {} else port) in ports, (name, port)
+                        assert config.get("ftp").get("user") == "ftp"
+            except BaseException as error:
+                errors.append(error)
+
+        readers = [threading.Thread(target=read) for _ in range(8)]
+        for reader in readers:
+            reader.start()
+
+        version = 0
+        while any(reader.is_alive() for reader in readers):
+            version += 1
+            replace(path, versions[version % 2])
+
+        for reader in readers:
+            reader.join()
+
+        assert errors == []
+        assert version > 1
@@ -226,3 +226,59 @@ def test_invalid_property_syntax(fixture, error):
             Configatron(tmpfile.name)
 
         assert error in str(excinfo.value)
+
+
+def test_background_validation_reports_errors():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"[ftp]\nport = 21\n[ftp]\nport = 22\n")
+        tmpfile.flush()
+
+        errors = []
+        config = Configatron(tmpfile.name, validate="background", validation_callback=errors.append)
+
+        # the config is available before being validated
+        assert config.get("ftp").get("port") == 22
+
+        config.validator.join()
+
+        assert config.validation_status() == {"status": "invalid", "error": "Duplicate group name: ftp"}
+        assert len(errors) == 1 and isinstance(errors[0], ValidationError)
+
+
+def test_background_validation_runs_again_on_changes():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"[ftp]\nport = 21\n")
+        tmpfile.flush()
+
+        errors = []
+        config = Configatron(tmpfile.name, validate="background", validation_callback=errors.append)
+        config.validator.join()
+
+        assert config.validation_status() == {"status": "valid", "error": None}
+
+        tmpfile.write(b"port = {}\n")
+        tmpfile.flush()
+        config.refresh()
+        config.validator.join()
+
+        assert config.validation_status() == {"status": "invalid", "error": "Invalid property: port = {}\n"}
+
+        config.refresh()
+        config.validator.join()
+
+        assert errors[0] is None and len(errors) == 2
+
+
+@pytest.mark.parametrize("validate, status", [(True, "valid"), (False, "disabled")])
+def test_validation_status(validate, status):
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"[ftp]\nport = 21\n")
+        tmpfile.flush()
+
+        assert Configatron(tmpfile.name, validate=validate).validation_status() == {"status": status, "error": None}
+
+
+def test_unknown_validation_mode():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        with pytest.raises(RuntimeError):
+            Configatron(tmpfile.name, validate="later")
@@ -0,0 +1,155 @@
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+import pytest
+
+from configatron import Configatron
+from configatron.watcher import EVENT, IN_MODIFY, IN_Q_OVERFLOW, Watcher
+
+
+inotify = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="needs inotify")
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+
+        time.sleep(0.01)
+
+    return False
+
+
+@pytest.mark.parametrize("backend", ["inotify", "poll"])
+def test_watcher_reindexes_in_background(backend):
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        path = os.path.join(directory, "config.ini")
+        with open(path, "w") as config_file:
+            config_file.write("[ftp]\nport = 21\n")
+
+        config = Configatron(path, watch=True, watch_options={"backend": backend, "interval": 0.05})
+
+        try:
+            assert config.get("ftp").get("port") == 21
+            assert config.get("ssh") == {}
+
+            with open(path, "a") as config_file:
+                config_file.write("\n[ssh]\nport = 22\n")
+
+            assert wait_for(lambda: config.get("ssh").get("port") == 22)
+
+            # replace the file, as editors and deploy tools usually do
+            with open(path + ".new", "w") as config_file:
+                config_file.write("[ftp]\nport = 2121\n")
+            os.rename(path + ".new", path)
+
+            assert wait_for(lambda: config.get("ftp").get("port") == 2121)
+            assert wait_for(lambda: config.get("ssh") == {})
+        finally:
+            config.close()
+
+
+def test_watched_get_never_reindexes():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"[ftp]\nport = 21\n")
+        tmpfile.flush()
+
+        config = Configatron(tmpfile.name, watch=True, watch_options={"backend": "poll", "interval": 60})
+
+        try:
+            with mock.patch.object(config.index, "build") as build:
+                assert config.get("ftp").get("port") == 21
+                assert config.get("missing") == {}
+
+            assert build.call_count == 0
+        finally:
+            config.close()
+
+
+@inotify
+def test_watcher_follows_swapped_links():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        # mounted like a Kubernetes config map: the config links to a directory link, swapped on updates
+        os.mkdir(os.path.join(directory, "..v1"))
+        with open(os.path.join(directory, "..v1", "config.ini"), "w") as config_file:
+            config_file.write("[ftp]\nport = 21\n")
+
+        os.symlink("..v1", os.path.join(directory, "..data"))
+        os.symlink(os.path.join("..data", "config.ini"), os.path.join(directory, "config.ini"))
+
+        # no refreshes without events
+        path = os.path.join(directory, "config.ini")
+        config = Configatron(path, watch=True, watch_options={"backend": "inotify", "interval": 60})
+
+        try:
+            assert config.get("ftp").get("port") == 21
+
+            for version, port in [("..v2", 2121), ("..v3", 2122)]:
+                os.mkdir(os.path.join(directory, version))
+                with open(os.path.join(directory, version, "config.ini"), "w") as config_file:
+                    config_file.write(f"[ftp]\nport = {port}\n")
+
+                os.symlink(version, os.path.join(directory, "..data_tmp"))
+                os.rename(os.path.join(directory, "..data_tmp"), os.path.join(directory, "..data"))
+
+                assert wait_for(lambda: config.get("ftp").get("port") == port)
+
+            # the file the links resolve to is watched as well
+            with open(os.path.join(directory, "..v3", "config.ini"), "a") as config_file:
+                config_file.write("[ssh]\nport = 22\n")
+
+            assert wait_for(lambda: config.get("ssh").get("port") == 22)
+        finally:
+            config.close()
+
+
+@inotify
+def test_watcher_refreshes_on_overflow():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        path = os.path.join(directory, "config.ini")
+        with open(path, "w") as config_file:
+            config_file.write("[ftp]\nport = 21\n")
+
+        watcher = Watcher(path, mock.Mock(), backend="inotify")
+        os.close(watcher.inotify)
+
+        # events read from a pipe instead
+        watcher.inotify, events = os.pipe()
+        os.set_blocking(watcher.inotify, False)
+
+        try:
+            (wd,) = watcher.watches
+            os.write(events, EVENT.pack(wd, IN_MODIFY, 0, 16) + b"other.ini".ljust(16, b"\0"))
+            assert not watcher._changed()
+
+            os.write(events, EVENT.pack(wd, IN_MODIFY, 0, 16) + b"config.ini".ljust(16, b"\0"))
+            assert watcher._changed()
+
+            # dropped events could have been about the config
+            os.write(events, EVENT.pack(-1, IN_Q_OVERFLOW, 0, 0))
+            assert watcher._changed()
+        finally:
+            for fd in (watcher.inotify, events, *watcher.wakeup):
+                os.close(fd)
+
+
+@inotify
+def test_watcher_refreshes_without_events():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        path = os.path.join(directory, "config.ini")
+        with open(path, "w") as config_file:
+            config_file.write("[ftp]\nport = 21\n")
+
+        refresh = mock.Mock()
+        watcher = Watcher(path, refresh, backend="inotify", interval=0.01)
+        watcher.start()
+
+        try:
+            # events can be missed, so the config is checked every interval anyway
+            assert wait_for(lambda: refresh.call_count >= 3)
+        finally:
+            watcher.stop()
@@ -0,0 +1,50 @@
+import itertools
+import random
+
+import pytest
+
+from configatron.nodes.property import coerce, properties
+
+
+# characters allowed in values, see `Property.REGEX`
+ALPHABET = 'a1-/,."'
+WORDS = ["yes", "no", "true", "false", "0", "1", "-0", "007", "1.5", "-.5", "5.", "/srv/../ftp", "//srv/./ftp/"]
+
+
+def pipeline(value: str):
+    """Try every kind of property, in order, like values used to be decoded."""
+
+    for kind in properties:
+        try:
+            decoded = kind(value)
+        except ValueError:
+            # malformed numbers, like 1.2.3
+            return None
+
+        if decoded is not None:
+            return decoded
+
+
+def values():
+    for length in range(5):
+        for characters in itertools.product(ALPHABET, repeat=length):
+            yield "".join(characters)
+
+    yield from WORDS
+
+    generator = random.Random(0)
+    for _ in range(10000):
+        yield "".join(generator.choice(ALPHABET + "0123456789xyz") for _ in range(generator.randint(1, 12)))
+
+
+def test_coerce_is_equivalent_to_the_pipeline():
+    for value in values():
+        expected, decoded = pipeline(value), coerce(value)
+
+        assert decoded == expected, value
+        assert type(decoded) is type(expected), value
+
+
+@pytest.mark.parametrize("value", ["1.2.3", "--1", "-1-", "1..2"])
+def test_malformed_numbers_are_not_valid(value):
+    assert coerce(value) is None
@@ -15,9 +15,12 @@ def test_get_from_index():
 
     group = mock.MagicMock()
     group.name = "test"
-    group.is_fresh = True
 
-    config.index = {"test": group}
+    config.index = mock.MagicMock()
+    config.index.get.return_value = group
+    config.index.is_fresh.return_value = True
 
     assert config.get("test") == group
     assert config.lru.get("test") == group
+    config.index.is_fresh.assert_called_once_with(group)
+    config.index.build.assert_not_called()
@@ -0,0 +1,30 @@
+import zlib
+
+import pytest
+
+from configatron.digests import DIGESTS
+
+
+@pytest.mark.parametrize("digest", DIGESTS)
+def test_digests_are_fed_block_by_block(digest):
+    content = b"[ftp]\nport = 21\npath = /srv/ftp\n"
+
+    _hash = DIGESTS[digest]()
+    for line in content.splitlines(keepends=True):
+        _hash.update(line)
+
+    whole = DIGESTS[digest]()
+    whole.update(content)
+
+    assert _hash.digest() == whole.digest()
+    assert _hash.hexdigest() == whole.digest().hex()
+    assert len(_hash.digest()) == _hash.digest_size <= 64
+    assert len(digest.encode()) <= 16
+
+
+@pytest.mark.parametrize("digest, checksum", [("crc32", zlib.crc32), ("adler32", zlib.adler32)])
+def test_checksums(digest, checksum):
+    _hash = DIGESTS[digest]()
+    _hash.update(b"port = 21\n")
+
+    assert _hash.digest() == checksum(b"port = 21\n").to_bytes(4, "big")
@@ -0,0 +1,71 @@
+import tempfile
+
+import pytest
+
+from configatron.engines import GroupDict, GroupTable
+from configatron.errors import ValidationError
+from configatron.reader import Reader
+from configatron.scanner import Scanner
+
+
+FIXTURE = b"""; preamble
+[second]
+a = 1
+[first]
+b = 2
+[third]
+c = 3
+[first]
+d = 4
+"""
+
+
+def groups(groups_index):
+    return [(group.name, group.header, group.start, group.end, group._hash) for group in groups_index.values()]
+
+
+@pytest.fixture
+def scanner():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(FIXTURE)
+        tmpfile.flush()
+
+        yield Scanner(Reader(tmpfile.name))
+
+
+@pytest.mark.parametrize("engine", [GroupDict, GroupTable])
+def test_build(scanner, engine):
+    groups_index, shadowed = engine.build(scanner, scanner.groups(False))
+
+    assert shadowed
+    assert len(groups_index) == 3
+    assert list(groups_index) == ["second", "third", "first"]
+    assert groups_index["first"].get("d") == 4
+    assert groups_index.get("missing") is None
+    assert [group.name for group in groups_index.ordered()] == ["second", "third", "first"]
+
+
+@pytest.mark.parametrize("engine", [GroupDict, GroupTable])
+def test_build_detects_duplicates(scanner, engine):
+    with pytest.raises(ValidationError) as excinfo:
+        engine.build(scanner, scanner.groups(False), True)
+
+    assert str(excinfo.value) == "Duplicate group name: first"
+
+
+def test_table_matches_dict(scanner):
+    table, _ = GroupTable.build(scanner, scanner.groups(False))
+    groups_index, _ = GroupDict.build(scanner, scanner.groups(False))
+
+    assert groups(table) == groups(groups_index)
+    assert table.headers.typecode == "I"
+
+    for name in groups_index:
+        group = table.get(name)
+        assert (group.name, group.start, group.end) == (name, groups_index[name].start, groups_index[name].end)
+
+    assert table.ordered()[-1].name == "first"
+    assert [group.name for group in table.ordered()[1:]] == ["third", "first"]
+
+    with pytest.raises(IndexError):
+        table.ordered()[3]
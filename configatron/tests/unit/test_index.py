@@ -0,0 +1,79 @@
+import os
+import tempfile
+from unittest import mock
+
+from configatron.index import Index
+from configatron.scanner import Scanner
+
+
+def write(tmpfile, content, mtime):
+    tmpfile.seek(0)
+    tmpfile.truncate()
+    tmpfile.write(content)
+    tmpfile.flush()
+
+    os.utime(tmpfile.name, ns=(mtime, mtime))
+
+
+def test_build_skips_unchanged_source():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        write(tmpfile, b"[group]\na = 1\n", 1_000_000_000_000_000_000)
+
+        index = Index(tmpfile.name)
+        index.build()
+
+        with mock.patch.object(index, "_compute_source_sample") as sample:
+            assert index.build() == set()
+
+        assert sample.call_count == 0
+
+
+def test_build_hashes_source_once_when_touched():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        write(tmpfile, b"[group]\na = 1\n", 1_000_000_000_000_000_000)
+
+        index = Index(tmpfile.name)
+        index.build()
+
+        # same content, new modification time: only a full hash can tell, and it's computed once
+        os.utime(tmpfile.name, ns=(1_500_000_000_000_000_000, 1_500_000_000_000_000_000))
+
+        with mock.patch.object(index, "_compute_source_key", wraps=index._compute_source_key) as source_key:
+            # every build scans its own snapshot, through a new scanner
+            with mock.patch.object(Scanner, "groups", wraps=Scanner.groups, autospec=True) as groups:
+                assert index.build() == set()
+                assert index.build() == set()
+                assert index.build() == set()
+
+        assert source_key.call_count == 1
+        assert groups.call_count == 0
+
+
+def test_build_detects_changes_with_same_size():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        write(tmpfile, b"[group]\na = 1\n", 1_000_000_000_000_000_000)
+
+        index = Index(tmpfile.name)
+        index.build()
+
+        write(tmpfile, b"[group]\na = 2\n", 1_500_000_000_000_000_000)
+
+        with mock.patch.object(index, "_compute_source_key") as source_key:
+            assert index.build() == {"group"}
+
+        # the sample already tells us the content changed
+        assert source_key.call_count == 0
+
+
+def test_build_does_not_trust_recent_modifications():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"[group]\na = 1\n")
+        tmpfile.flush()
+
+        index = Index(tmpfile.name)
+        index.build()
+
+        mtime = os.stat(tmpfile.name).st_mtime_ns
+        write(tmpfile, b"[group]\na = 2\n", mtime)
+
+        assert index.build() == {"group"}
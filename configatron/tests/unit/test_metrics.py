@@ -0,0 +1,42 @@
+import time
+from unittest import mock
+
+from configatron.lru import LRUCache
+from configatron.metrics import Metrics
+
+
+def test_metrics_are_added_and_reported_to_the_hook():
+    hook = mock.Mock()
+    metrics = Metrics(hook)
+
+    metrics.add("cache.hits")
+    metrics.add("cache.hits")
+    metrics.add("hash.seconds", 0.5)
+
+    assert metrics.stats() == {"cache.hits": 2, "hash.seconds": 0.5}
+    assert hook.call_args_list == [
+        mock.call("cache.hits", 1),
+        mock.call("cache.hits", 1),
+        mock.call("hash.seconds", 0.5),
+    ]
+
+
+def test_cache_metrics():
+    metrics = Metrics()
+    cache = LRUCache(1, 10, metrics)
+
+    cache.put("first", 1)
+    assert cache.get("first") == 1
+    assert cache.get("second") is None
+
+    cache.put("second", 2)
+
+    with mock.patch("time.time", return_value=time.time() + 100):
+        assert cache.get("second") is None
+
+    assert metrics.stats() == {
+        "cache.hits": 1,
+        "cache.misses": 2,
+        "cache.evictions": 1,
+        "cache.expirations": 1,
+    }
@@ -1,6 +1,6 @@
 import pytest
 
-from configatron.nodes.property import string, number, path, boolean, array
+from configatron.nodes.property import Candidates, Property, Raw, string, number, path, boolean, array
 
 
 @pytest.mark.parametrize(
@@ -102,3 +102,27 @@ def test_boolean(value, expected):
 )
 def test_array(value, expected):
     assert array(value) == expected
+
+
+def test_lazy_property_keeps_raw_value():
+    property = Property.lazy("port<staging> = 21 ; comment")
+
+    assert (property.name, property.value, property.override) == ("port", "21", "staging")
+    assert type(property.value) is Raw
+    assert Property.decode(property.value) == 21
+
+    assert Property.lazy("; comment") is None
+    assert Property.decode("abc") is None
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        (["21", "abc"], 21),
+        (["abc", "21", "22"], 21),
+        (["abc", "no"], False),
+        (["abc", "def"], None),
+    ],
+)
+def test_candidates_decode_first_valid_value(values, expected):
+    assert Candidates(Raw(value) for value in values).decode() == expected
@@ -0,0 +1,89 @@
+import gc
+import sys
+import tempfile
+
+import pytest
+
+from configatron.reader import Reader, MmapReader
+
+
+@pytest.mark.parametrize("buffer_size", [1, 2, 3, 7, 64 * 1024])
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        "\n",
+        "[group]\na = 1\n",
+        "[group]\na = 1",
+        "\n\n[group]\n\nvery_long_property_name = 123\nb = no\n\n",
+        "[group]\na = " + "1," * 5000 + "1\nb = 2\n",
+        "[group]\na = " + "1," * 5000 + "1",
+    ],
+)
+def test_lines_with_buffer_size(content, buffer_size):
+    assert_lines(Reader, content, buffer_size=buffer_size)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "",
+        "\n",
+        "[group]\na = 1\n",
+        "[group]\na = 1",
+        "\n\n[group]\n\nvery_long_property_name = 123\nb = no\n\n",
+    ],
+)
+def test_mmap_lines(content):
+    assert_lines(MmapReader, content)
+
+
+def assert_lines(reader_class, content, **options):
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(content.encode())
+        tmpfile.flush()
+
+        lines = list(reader_class(tmpfile.name, **options).lines())
+
+        assert [line for _, _, line in lines] == content.encode().splitlines(keepends=True)
+
+        position = 0
+        for start, end, line in lines:
+            assert start == position
+            assert end == start + len(line)
+            position = end
+
+
+def test_mmap_remaps_on_size_change():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(b"[group]\na = 1\n")
+        tmpfile.flush()
+
+        reader = MmapReader(tmpfile.name)
+        assert reader.block(8) == b"a = 1\n"
+
+        tmpfile.seek(0)
+        tmpfile.truncate()
+        tmpfile.write(b"[group]\na = 12345\n")
+        tmpfile.flush()
+
+        assert reader.block(8) == b"a = 12345\n"
+
+        tmpfile.seek(0)
+        tmpfile.truncate()
+        tmpfile.flush()
+
+        assert reader.block(0) == b""
+        assert list(reader.lines()) == []
+
+
+@pytest.mark.parametrize("reader", [Reader, MmapReader])
+def test_missing_file(reader, monkeypatch):
+    unraisable = []
+    monkeypatch.setattr(sys, "unraisablehook", unraisable.append)
+
+    with pytest.raises(RuntimeError, match="Missing /missing/config.ini file"):
+        reader("/missing/config.ini")
+
+    gc.collect()
+    assert unraisable == []
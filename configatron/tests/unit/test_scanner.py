@@ -0,0 +1,91 @@
+import random
+import tempfile
+from unittest import mock
+
+import pytest
+
+from configatron.reader import DEFAULT_BUFFER_SIZE, Reader
+from configatron.scanner import Scanner
+
+
+FIXTURE = """
+; preamble
+[first]
+a = 1
+b = "two"
+
+[second] ; comment
+c = /a/b
+"""
+
+
+def test_groups_reads_the_file_once():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(FIXTURE.encode())
+        tmpfile.flush()
+
+        reader = Reader(tmpfile.name)
+        scanner = Scanner(reader)
+
+        with mock.patch.object(reader, "block", wraps=reader.block) as block:
+            groups = list(scanner.groups())
+
+        assert block.call_count == 0
+        assert [group.name for group in groups] == ["first", "second"]
+
+        for group in groups:
+            assert group._hash == scanner.compute_hash(group.start, group.end).digest()
+
+
+def test_boundary_finds_next_group_header():
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(FIXTURE.encode())
+        tmpfile.flush()
+
+        scanner = Scanner(Reader(tmpfile.name))
+        first, second = FIXTURE.index("[first]"), FIXTURE.index("[second]")
+
+        assert scanner.boundary(0) == first
+        assert scanner.boundary(first) == first
+        assert scanner.boundary(first + 1) == second
+        assert scanner.boundary(second - 1) == second
+        assert scanner.boundary(second + 1) == len(FIXTURE)
+        assert scanner.boundary(first + 1, second - 1) == second - 1
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("buffer_size", [1, 7, 64, DEFAULT_BUFFER_SIZE])
+def test_block_and_line_scans_find_the_same_groups(seed, buffer_size):
+    rand = random.Random(seed)
+    lines = [
+        "[group]",
+        "  [spaced]  ; comment",
+        "[tabbed]\t\r",
+        "[invalid name]",
+        "[broken",
+        "a = [1]",
+        "; [commented]",
+        "a = 1",
+        "",
+        "\t",
+        "b = /a/b ; [x]",
+        "c = " + "1," * 1000 + "1",
+    ]
+    content = "\n".join(rand.choice(lines) for _ in range(rand.randint(0, 50)))
+    if rand.random() < 0.5:
+        content += "\n"
+
+    with tempfile.NamedTemporaryFile(dir="/tmp") as tmpfile:
+        tmpfile.write(content.encode())
+        tmpfile.flush()
+
+        scanner = Scanner(Reader(tmpfile.name, buffer_size))
+
+        def groups(scan, *interval):
+            return [(group.name, group.header, group.start, group.end, group._hash) for group in scan(*interval)]
+
+        headers = [0] + [group.header for group in scanner._scan_lines(False)] + [len(content.encode())]
+        start, end = sorted(rand.sample(headers, 2)) if len(headers) > 2 else (0, None)
+
+        assert groups(scanner._scan_blocks) == groups(scanner._scan_lines, False)
+        assert groups(scanner._scan_blocks, start, end) == groups(scanner._scan_lines, False, start, end)
@@ -0,0 +1,56 @@
+import os
+import tempfile
+
+from configatron.index import Index
+from configatron.sidecar import Sidecar
+
+
+def test_dump_and_load():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        source = os.path.join(directory, "config.ini")
+        with open(source, "wb") as config:
+            config.write(b"; preamble\n[ftp]\nport = 21\n[http]\nport = 80\n")
+
+        index = Index(source)
+        index.build(True)
+
+        sidecar = Sidecar(os.path.join(directory, "config.idx"))
+        sidecar.dump(
+            (1, 2, 3), index._compute_source_key(index.reader), True, False, index.preamble_hash, index.groups_index
+        )
+
+        state = sidecar.load()
+
+        assert state.signature == (1, 2, 3)
+        assert state.source_key == index._compute_source_key(index.reader)
+        assert state.validated and not state.shadowed
+        assert state.preamble_hash == index.preamble_hash
+        assert state.groups == [
+            (group.name, group.header, group.start, group.end, group._hash) for group in index.groups_index.values()
+        ]
+
+
+def test_load_ignores_missing_and_corrupted_sidecars():
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        path = os.path.join(directory, "config.idx")
+        sidecar = Sidecar(path)
+
+        assert sidecar.load() is None
+
+        with open(path, "wb") as corrupted:
+            corrupted.write(b"CFGI")
+
+        assert sidecar.load() is None
+
+        sidecar.dump(None, "00" * 64, False, False, None, {})
+        with open(path, "ab") as corrupted:
+            corrupted.write(b"\0")
+
+        assert sidecar.load() is None
+
+
+def test_dump_fails_silently():
+    sidecar = Sidecar("/nonexistent/config.idx")
+    sidecar.dump(None, "00" * 64, False, False, None, {})
+
+    assert sidecar.load() is None
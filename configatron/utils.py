@@ -5,3 +5,12 @@ class EmptyConfig(dict):
 
     def get(self, name):
         return EmptyConfig()
+
+
+class AsyncEmptyConfig(dict):
+    """
+    Empty dict that for `await .get()` it always returns itself.
+    """
+
+    async def get(self, name):
+        return AsyncEmptyConfig()
@@ -0,0 +1,89 @@
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+from configatron.errors import ValidationError
+
+
+class Validator:
+    """
+    Validate the config in a background thread, so the index can be built without validation and used right away.
+
+    Validations requested while one is running are coalesced: the running one starts over once it's done, and only the
+    result for the latest version of the config is reported.
+    """
+
+    def __init__(self, index: "Index", callback: Callable[[Optional[ValidationError]], None] = None):
+        self.index = index
+        self.callback = callback
+
+        self.status = "pending"
+        self.error = None
+
+        self.lock = threading.Lock()
+        self.thread = None
+        self.requested = False
+
+    def start(self):
+        """
+        Validate the config in background, or start over if it's already being validated.
+
+        :return: None
+        """
+
+        with self.lock:
+            self.status = "pending"
+            self.error = None
+
+            if self.thread is not None:
+                self.requested = True
+                return
+
+            self.thread = threading.Thread(target=self.run, name=f"configatron-validator-{self.index.source}")
+            self.thread.daemon = True
+            self.thread.start()
+
+    def run(self):
+        while True:
+            status, error = "valid", None
+            try:
+                self.index.validate()
+            except ValidationError as e:
+                status, error = "invalid", e
+            except Exception as e:
+                logging.exception(f"Failed to validate {self.index.source}.")
+                status, error = "failed", e
+
+            with self.lock:
+                if self.requested:
+                    self.requested = False
+                    continue
+
+                self.status, self.error = status, error
+                self.thread = None
+                break
+
+        if self.callback is not None:
+            self.callback(error)
+
+    def join(self, timeout: float = None):
+        """
+        Wait for the running validation, if any, to finish.
+
+        :param timeout: seconds to wait for
+        :return: None
+        """
+
+        thread = self.thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, Optional[str]]:
+        """
+        Validation's status: pending, valid, invalid or failed (the config couldn't be read) and its error, if any.
+
+        :return: dict
+        """
+
+        with self.lock:
+            return {"status": self.status, "error": None if self.error is None else str(self.error)}
@@ -0,0 +1,238 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, List, Tuple
+
+
+# inotify(7) flags, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+IN_EVENTS = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# struct inotify_event: wd, mask, cookie, len, followed by a null padded name
+EVENT = struct.Struct("iIII")
+
+# Symbolic links followed while resolving the source, like the kernel's limit.
+MAX_LINKS = 40
+
+
+class Watcher(threading.Thread):
+    """
+    Watch the config file in a background thread and call `refresh` every time it changes.
+
+    On Linux, changes are picked up with inotify. The directories of the file, of every symbolic link it resolves
+    through and of the file it resolves to are watched, so files replaced by a rename and links swapped for others, like
+    in Kubernetes' mounted config maps, are picked up as well. Events can still be missed, so `refresh` is called every
+    `interval` seconds without any event too. Otherwise, or if inotify is not available, `refresh` is called every
+    `interval` seconds. Either way, it's up to it to cheaply detect if something changed.
+    """
+
+    def __init__(self, source: str, refresh: Callable[[], None], backend: str = "auto", interval: float = 1):
+        super().__init__(name=f"configatron-watcher-{source}", daemon=True)
+
+        if backend not in {"auto", "inotify", "poll"}:
+            raise RuntimeError(f"Unknown watcher backend {backend}, expected one of: auto, inotify, poll")
+
+        self.source = os.path.abspath(source)
+        self.refresh = refresh
+        self.interval = interval
+
+        self.stopped = threading.Event()
+
+        # names watched in each directory, by watch descriptor
+        self.watches = {}
+
+        self.inotify = None
+        if backend != "poll":
+            self.inotify = self._inotify()
+
+            if self.inotify is None and backend == "inotify":
+                raise RuntimeError("inotify is not available")
+
+        self.backend = "inotify" if self.inotify is not None else "poll"
+
+        # written to by `stop`, so it doesn't wait for inotify's next event or timeout
+        self.wakeup = os.pipe() if self.inotify is not None else None
+
+    def _inotify(self):
+        """
+        Create an inotify instance, watching the source's directory and the directories of the links it resolves
+        through.
+
+        :return: inotify file descriptor or None, if inotify is not available.
+        """
+
+        if not sys.platform.startswith("linux"):
+            return None
+
+        try:
+            self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+            fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                return None
+
+            if not self._watch(fd):
+                os.close(fd)
+                return None
+        except (OSError, AttributeError):
+            return None
+
+        return fd
+
+    def _entries(self) -> List[Tuple[str, str]]:
+        """
+        Directory entries the source resolves through: the source itself, every symbolic link on its path, including
+        its directories, and the file it resolves to.
+
+        :return: (directory, name) of each entry, starting with the source.
+        """
+
+        path = self.source
+        entries = [os.path.split(path)]
+
+        for _ in range(MAX_LINKS):
+            parts = path.split(os.sep)[1:]
+
+            for position in range(len(parts)):
+                prefix = os.sep + os.path.join(*parts[: position + 1])
+                if not os.path.islink(prefix):
+                    continue
+
+                try:
+                    target = os.path.join(os.path.dirname(prefix), os.readlink(prefix))
+                except OSError:
+                    return entries
+
+                entries.append(os.path.split(prefix))
+                path = os.path.normpath(os.path.join(target, *parts[position + 1 :]))
+                break
+            else:
+                break
+
+        entries.append(os.path.split(path))
+        return entries
+
+    def _watch(self, fd: int) -> bool:
+        """
+        Watch the directories of the entries the source resolves through. Links can be swapped for others, so they're
+        resolved again after every change.
+
+        :param fd: inotify file descriptor.
+        :return: whether the source's own directory is watched.
+        """
+
+        watches = {}
+        for directory, name in self._entries():
+            wd = self.libc.inotify_add_watch(fd, directory.encode(), IN_EVENTS)
+            if wd >= 0:
+                watches.setdefault(wd, set()).add(name.encode())
+            elif directory == os.path.dirname(self.source):
+                return False
+
+        for wd in self.watches.keys() - watches.keys():
+            self.libc.inotify_rm_watch(fd, wd)
+
+        self.watches = watches
+        return True
+
+    def _changed(self) -> bool:
+        """
+        Read all pending inotify events and check if any of them is about an entry the source resolves through.
+
+        :return: bool
+        """
+
+        try:
+            data = os.read(self.inotify, 64 * 1024)
+        except BlockingIOError:
+            return False
+
+        changed = False
+
+        position = 0
+        while position < len(data):
+            wd, mask, _, length = EVENT.unpack_from(data, position)
+            position += EVENT.size
+
+            # events were dropped, or a watched directory is gone
+            if mask & (IN_Q_OVERFLOW | IN_IGNORED):
+                changed = True
+            elif data[position : position + length].rstrip(b"\0") in self.watches.get(wd, ()):
+                changed = True
+
+            position += length
+
+        return changed
+
+    def _refresh(self):
+        try:
+            self.refresh()
+        except Exception:
+            # keep serving the last good index, we'll retry on the next change
+            logging.exception(f"Failed to refresh {self.source}.")
+
+    def run(self):
+        if self.inotify is None:
+            while not self.stopped.wait(self.interval):
+                self._refresh()
+
+            return
+
+        try:
+            while not self.stopped.is_set():
+                # refreshes check the source's signature first, so they're cheap even without any event
+                readable, _, _ = select.select([self.inotify, self.wakeup[0]], [], [], self.interval)
+                if self.stopped.is_set():
+                    break
+
+                if readable:
+                    if not self._changed():
+                        continue
+
+                    # wait for writes to settle, so we don't index a half written file
+                    while select.select([self.inotify], [], [], 0.05)[0]:
+                        self._changed()
+
+                if self.stopped.is_set():
+                    break
+
+                self._watch(self.inotify)
+                self._refresh()
+        finally:
+            os.close(self.inotify)
+            os.close(self.wakeup[0])
+
+    def stop(self):
+        """
+        Stop watching, and wait for the background thread to finish.
+
+        :return: None
+        """
+
+        stopping = not self.stopped.is_set() and self.wakeup is not None
+        self.stopped.set()
+
+        if stopping:
+            os.write(self.wakeup[1], b"\0")
+
+        if self.is_alive():
+            self.join()
+
+        if stopping:
+            os.close(self.wakeup[1])